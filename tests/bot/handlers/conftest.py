@@ -0,0 +1,459 @@
+"""Общие фикстуры для тестов обработчиков бота.
+
+Содержит лёгкие заглушки объектов aiogram, которые переиспользуются
+в нескольких тестовых модулях tests/bot/handlers/.
+
+Заглушки mock_message, mock_l10n, mock_fsm_context и mock_bot создаются
+один раз на сессию (shared_*) и сбрасываются после каждого теста.
+mock_callback_query и mock_db_user — общие для /language, /settings и /invite.
+Модули с собственными моками переопределяют эти фикстуры локально.
+
+MagicMock(spec=Message) при создании обходит весь класс aiogram Message,
+поэтому там, где обработчику нужны только from_user, text и answer,
+используется SimpleNamespace — он создаётся на порядки быстрее.
+"""
+
+from collections.abc import Callable, Iterator
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, _Call, call
+
+import pytest
+from aiogram import Bot
+from aiogram.fsm.context import FSMContext
+from aiogram.types import Message
+
+# Модули обработчиков импортируются при загрузке conftest, до сбора
+# тестовых файлов: граф импортов (aiogram, SQLAlchemy, провайдеры AI)
+# загружается в одной точке, а не при сборе первого тестового модуля.
+from src.bot.handlers import imagine, invite  # noqa: F401
+from src.utils.i18n import Localization
+
+# Общий словарь переводов для тестов обработчиков /error, /help, /imagine,
+# /invite и fallback-обработчика неизвестных команд.
+_TRANSLATIONS = {
+    "error_test_triggered": (
+        "🔴 Тестовая ошибка успешно вызвана!\n\n"
+        "Это сообщение подтверждает, что:\n"
+        "• Команда /error работает\n"
+        "• Ошибка залогирована в терминале\n"
+        "• Система мониторинга уведомлена"
+    ),
+    "command_not_found": "❌ Команда /{command} не найдена или отключена.",
+    "help_message_with_contact": "❓ Помощь\n\nКонтакт: {contact}",
+    "help_message_no_contact": "❓ Помощь\n\nКонтакт не указан.",
+    "imagine_choose_model": "🎨 <b>Выберите модель для генерации:</b>",
+    "imagine_model_selected": "✅ Модель выбрана: <b>{model_key}</b>",
+    "imagine_model_not_selected": "❌ Модель не выбрана.",
+    "imagine_generating": "⏳ Генерирую изображение...",
+    "imagine_generated": "🎨 Изображение сгенерировано моделью {model_key}",
+    "imagine_empty_response": "❌ AI вернул пустой ответ.",
+    "imagine_generation_error": "❌ Ошибка генерации: {error}",
+    "imagine_unexpected_error": "❌ Произошла неожиданная ошибка.",
+    "no_models_available": "❌ Модели недоступны",
+    "invite_disabled": "Реферальная программа отключена",
+    "invite_info": (
+        "Ваша реферальная ссылка: {link}\n\n"
+        "Приглашено: {total_referrals}\n"
+        "Заработано: {total_earnings}\n"
+        "Бонус за реферала: {inviter_bonus}\n"
+        "Максимум: {max_earnings}"
+    ),
+    "invite_pending_bonuses": "Невыплаченных бонусов: {count}",
+    "invite_max_reached": "Достигнут максимальный лимит заработка",
+    "error_user_not_found": "Пользователь не найден в БД",
+    "error_unknown": "Произошла неизвестная ошибка",
+    "error_db_temporary": "❌ Временная ошибка БД.",
+    "error_db_permanent": "❌ Ошибка при работе с базой данных.",
+}
+
+
+def _get_translation(key: str, **kwargs: Any) -> str:
+    """Вернуть перевод с подставленными параметрами.
+
+    Без параметров str.format() не вызывается — возвращается сам текст.
+    """
+    text = _TRANSLATIONS.get(key, key)
+    return text.format(**kwargs) if kwargs else text
+
+
+class AsyncCallRecorder:
+    """Лёгкая замена AsyncMock для методов, которые только await-ятся.
+
+    AsyncMock при создании настраивает протоколы корутин, асинхронных
+    итераторов и контекст-менеджеров. Для message.answer достаточно
+    записать аргументы вызова.
+
+    Аргументы хранятся в обычных атрибутах: calls — список пар
+    (args, kwargs), last_args / last_kwargs — аргументы последнего вызова.
+    Для совместимости с API Mock есть call_args, call_args_list,
+    assert_called_once(), assert_not_called() и reset_mock().
+    """
+
+    def __init__(self, return_value: Any = None) -> None:
+        self.return_value = return_value
+        self.calls: list[tuple[tuple[Any, ...], dict[str, Any]]] = []
+        self.last_args: tuple[Any, ...] = ()
+        self.last_kwargs: dict[str, Any] = {}
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        self.calls.append((args, kwargs))
+        self.last_args = args
+        self.last_kwargs = kwargs
+        return self.return_value
+
+    @property
+    def call_args(self) -> Any:
+        """Последний вызов в виде unittest.mock.call (или None).
+
+        Как и у Mock, это пара (args, kwargs): call_args[0][0] — первый
+        позиционный аргумент.
+        """
+        if not self.calls:
+            return None
+        return _Call((self.last_args, self.last_kwargs), two=True)
+
+    @property
+    def call_args_list(self) -> list[Any]:
+        """Все вызовы в виде списка unittest.mock.call."""
+        return [_Call(recorded, two=True) for recorded in self.calls]
+
+    def assert_called_once(self) -> None:
+        """Проверить, что метод был вызван ровно один раз."""
+        assert len(self.calls) == 1, f"Ожидался один вызов, было {len(self.calls)}"
+
+    def assert_called_once_with(self, *args: Any, **kwargs: Any) -> None:
+        """Проверить, что метод был вызван ровно один раз с этими аргументами."""
+        self.assert_called_once()
+        assert self.calls[0] == (args, kwargs), (
+            f"Ожидался вызов {call(*args, **kwargs)}, был {self.call_args}"
+        )
+
+    def assert_not_called(self) -> None:
+        """Проверить, что метод не вызывался."""
+        assert not self.calls, f"Ожидалось отсутствие вызовов, было {len(self.calls)}"
+
+    def reset_mock(self) -> None:
+        """Очистить историю вызовов и return_value."""
+        self.return_value = None
+        self.calls.clear()
+        self.last_args = ()
+        self.last_kwargs = {}
+
+
+class AsyncContextStub:
+    """Лёгкий асинхронный контекст-менеджер, возвращающий заданное значение.
+
+    Заменяет цепочку session_cls.return_value.__aenter__.return_value:
+    у MagicMock она создаёт несколько дочерних моков и AsyncMock
+    для __aenter__ / __aexit__ в каждом тесте.
+    """
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    async def __aenter__(self) -> Any:
+        return self.value
+
+    async def __aexit__(self, *exc_info: object) -> bool:
+        return False
+
+
+@pytest.fixture
+def db_session_cm() -> AsyncContextStub:
+    """Контекст-менеджер вместо DatabaseSession() с заглушкой сессии.
+
+    Обработчики только передают сессию в репозитории и сервисы
+    (в тестах они подменены), поэтому сессией служит простой
+    object()-маркер. Использование в тесте:
+    mock_session_cls.return_value = db_session_cm.
+    """
+    return AsyncContextStub(object())
+
+
+def _make_message(
+    user_id: int = 123456789,
+    username: str | None = "test_user",
+    text: str | None = "/unknown_command",
+) -> Any:
+    """Создать лёгкую заглушку Message.
+
+    Args:
+        user_id: Telegram ID отправителя.
+        username: Username отправителя.
+        text: Текст сообщения.
+
+    Returns:
+        Объект с атрибутами from_user, text и асинхронным методом answer
+        (AsyncCallRecorder).
+    """
+    return SimpleNamespace(
+        from_user=SimpleNamespace(id=user_id, username=username),
+        text=text,
+        answer=AsyncCallRecorder(),
+    )
+
+
+@pytest.fixture(scope="session")
+def make_message() -> Callable[..., Any]:
+    """Фабрика лёгких заглушек Message (см. _make_message)."""
+    return _make_message
+
+
+@pytest.fixture(scope="session")
+def shared_message() -> Any:
+    """Заглушка Message, создаваемая один раз на всю тестовую сессию.
+
+    Напрямую в тестах не используется — см. фикстуру mock_message.
+    """
+    return _make_message()
+
+
+@pytest.fixture
+def mock_message(shared_message: Any) -> Iterator[Any]:
+    """Общая заглушка Message с восстановлением состояния после теста.
+
+    Тесты могут менять from_user, username и text — после теста они
+    возвращаются к значениям по умолчанию, а у answer очищается история
+    вызовов. Модули, которым нужен полноценный мок Message,
+    переопределяют эту фикстуру.
+    """
+    yield shared_message
+    shared_message.from_user = SimpleNamespace(id=123456789, username="test_user")
+    shared_message.text = "/unknown_command"
+    shared_message.answer.reset_mock()
+
+
+class L10nStub:
+    """Заглушка Localization без spec-интроспекции класса.
+
+    Обработчикам нужен только метод get(); он остаётся MagicMock,
+    поэтому assert_called_with() и call_args работают как обычно.
+
+    get оборачивает _get_translation через wraps, а не side_effect:
+    тест может задать get.return_value, чтобы подменить перевод,
+    а reset_mock(return_value=True) вернёт словарные переводы.
+    """
+
+    def __init__(self, language: str = "ru") -> None:
+        self.language = language
+        self.get = MagicMock(wraps=_get_translation)
+
+
+@pytest.fixture(scope="session")
+def shared_l10n() -> L10nStub:
+    """Заглушка Localization, создаваемая один раз на всю тестовую сессию.
+
+    Напрямую в тестах не используется — см. фикстуру mock_l10n.
+    """
+    return L10nStub()
+
+
+@pytest.fixture
+def mock_l10n(shared_l10n: L10nStub) -> Iterator[L10nStub]:
+    """Общая заглушка Localization со сбросом истории вызовов после теста.
+
+    Модули с собственным набором переводов переопределяют эту фикстуру.
+    """
+    yield shared_l10n
+    shared_l10n.get.reset_mock()
+
+
+# Кэш AsyncMock по имени: AsyncMock при создании настраивает протоколы
+# корутин и заметно дороже MagicMock, поэтому асинхронные методы моков
+# создаются один раз за сессию и очищаются при каждой выдаче.
+_ASYNC_MOCKS: dict[str, AsyncMock] = {}
+
+
+def _shared_async_mock(name: str, **configure: Any) -> AsyncMock:
+    """Вернуть общий AsyncMock по имени — очищенный и заново настроенный.
+
+    Args:
+        name: Уникальное имя места использования (например, "fsm.get_data").
+        **configure: Атрибуты для configure_mock() (return_value, side_effect).
+
+    Returns:
+        AsyncMock без истории вызовов, return_value и side_effect,
+        настроенный переданными атрибутами.
+    """
+    mock = _ASYNC_MOCKS.get(name)
+    if mock is None:
+        mock = _ASYNC_MOCKS[name] = AsyncMock()
+    else:
+        mock.reset_mock(return_value=True, side_effect=True)
+    mock.configure_mock(**configure)
+    return mock
+
+
+@pytest.fixture(scope="session")
+def shared_async_mock() -> Callable[..., AsyncMock]:
+    """Фабрика общих AsyncMock (см. _shared_async_mock).
+
+    Фикстуры модулей получают через неё асинхронные методы моков
+    вместо создания нового AsyncMock() в каждом тесте.
+    """
+    return _shared_async_mock
+
+
+# Обработчики проверяют isinstance(callback.message, Message), поэтому
+# callback.message — мок со spec. MagicMock(spec=Message) при создании
+# разбирает весь класс aiogram, поэтому он создаётся один раз при импорте,
+# а фикстура mock_callback_query сбрасывает его и заново задаёт атрибуты.
+_CALLBACK_MESSAGE_PROTOTYPE = MagicMock(spec=Message)
+
+
+@pytest.fixture
+def async_session() -> Any:
+    """Заглушка AsyncSession для обработчиков, которые сами работают с сессией.
+
+    commit, flush и refresh берутся из кэша AsyncMock (см. _shared_async_mock),
+    а не создаются заново в каждом тесте. Остальные методы сессии
+    обработчики не вызывают — запросы идут через подменённые репозитории.
+    Использование: db_session_cm.value = async_session.
+    """
+    return SimpleNamespace(
+        commit=_shared_async_mock("session.commit"),
+        flush=_shared_async_mock("session.flush"),
+        refresh=_shared_async_mock("session.refresh"),
+    )
+
+
+@pytest.fixture
+def mock_user_repo() -> MagicMock:
+    """Мок UserRepository для /start и /terms.
+
+    Асинхронные методы берутся из кэша AsyncMock, синхронные
+    (needs_terms_acceptance) — обычные атрибуты MagicMock. Тест задаёт
+    только нужные значения, например
+    mock_user_repo.get_or_create.return_value = (user, True).
+    """
+    repo = MagicMock()
+    repo.get_or_create = _shared_async_mock("user_repo.get_or_create")
+    repo.get_by_telegram_id = _shared_async_mock("user_repo.get_by_telegram_id")
+    repo.update_profile = _shared_async_mock("user_repo.update_profile")
+    repo.accept_terms = _shared_async_mock("user_repo.accept_terms")
+    return repo
+
+
+@pytest.fixture
+def mock_billing() -> Any:
+    """Заглушка BillingService: регистрационный бонус по умолчанию 0.
+
+    Тест, проверяющий начисление, задаёт
+    mock_billing.grant_registration_bonus.return_value.
+    """
+    return SimpleNamespace(
+        grant_registration_bonus=_shared_async_mock(
+            "billing.grant_registration_bonus", return_value=0
+        )
+    )
+
+
+@pytest.fixture
+def welcome_image(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    """Подменить WELCOME_IMAGE в обработчиках /start и /terms.
+
+    По умолчанию картинка существует — приветствие уходит фото.
+    Тест без картинки задаёт welcome_image.exists.return_value = False.
+    """
+    image = MagicMock()
+    image.exists.return_value = True
+    monkeypatch.setattr("src.bot.handlers.start.WELCOME_IMAGE", image)
+    monkeypatch.setattr("src.bot.handlers.terms.WELCOME_IMAGE", image)
+    return image
+
+
+@pytest.fixture
+def mock_callback_query() -> MagicMock:
+    """Мок CallbackQuery от пользователя 123456789.
+
+    callback.data не задан (None) — тест задаёт его сам. callback.answer
+    и callback.message.edit_text берутся из кэша AsyncMock. Модули,
+    которым нужен полноценный мок CallbackQuery, переопределяют эту
+    фикстуру.
+    """
+    callback = MagicMock()
+    callback.from_user = SimpleNamespace(id=123456789, username="test_user")
+    callback.data = None
+    callback.answer = _shared_async_mock("callback.answer")
+
+    message = _CALLBACK_MESSAGE_PROTOTYPE
+    message.reset_mock()
+    message.edit_text = _shared_async_mock("callback.message.edit_text")
+    callback.message = message
+    return callback
+
+
+@pytest.fixture(scope="module")
+def mock_db_user() -> Any:
+    """Заглушка пользователя из БД.
+
+    Обработчики только передают пользователя в репозитории и сервисы,
+    поэтому достаточно SimpleNamespace с полями модели. Тесты её
+    не меняют, поэтому она создаётся один раз на модуль.
+    """
+    return SimpleNamespace(id=1, telegram_id=123456789, language="ru")
+
+
+@pytest.fixture
+def ru_en_languages(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Сделать доступными языки ru и en.
+
+    get_available_languages — staticmethod класса Localization, поэтому
+    одной подмены достаточно и для обработчиков, и для клавиатур.
+    Модули подключают фикстуру через pytest.mark.usefixtures.
+    """
+    monkeypatch.setattr(
+        Localization, "get_available_languages", staticmethod(lambda: ["ru", "en"])
+    )
+
+
+@pytest.fixture(scope="session")
+def shared_fsm_context() -> MagicMock:
+    """Мок FSMContext, создаваемый один раз на всю тестовую сессию.
+
+    Напрямую в тестах не используется — см. фикстуру mock_fsm_context.
+    """
+    return MagicMock(spec=FSMContext)
+
+
+@pytest.fixture
+def mock_fsm_context(shared_fsm_context: MagicMock) -> MagicMock:
+    """Мок FSMContext с пустым состоянием.
+
+    Мок сбрасывается, а его асинхронные методы заново привязываются
+    из кэша AsyncMock, поэтому тест может свободно менять или подменять
+    get_data / get_state. Модули с особым состоянием FSM переопределяют
+    эту фикстуру.
+    """
+    context = shared_fsm_context
+    context.reset_mock()
+    context.set_state = _shared_async_mock("fsm.set_state")
+    context.update_data = _shared_async_mock("fsm.update_data")
+    context.get_data = _shared_async_mock("fsm.get_data", return_value={})
+    context.get_state = _shared_async_mock("fsm.get_state", return_value=None)
+    context.clear = _shared_async_mock("fsm.clear")
+    return context
+
+
+@pytest.fixture(scope="session")
+def shared_bot() -> MagicMock:
+    """Мок Bot, создаваемый один раз на всю тестовую сессию.
+
+    Напрямую в тестах не используется — см. фикстуру mock_bot.
+    """
+    return MagicMock(spec=Bot)
+
+
+@pytest.fixture
+def mock_bot(shared_bot: MagicMock) -> MagicMock:
+    """Мок Bot с username "test_bot".
+
+    get_me() возвращает SimpleNamespace: обработчики читают только
+    username, а тест может его переопределить.
+    """
+    bot = shared_bot
+    bot.reset_mock()
+    bot_me = SimpleNamespace(username="test_bot")
+    bot.get_me = _shared_async_mock("bot.get_me", return_value=bot_me)
+    return bot
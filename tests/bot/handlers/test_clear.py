@@ -8,7 +8,7 @@
 
 from collections.abc import AsyncGenerator, Callable
 from contextlib import AbstractAsyncContextManager
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from aiogram.fsm.context import FSMContext
@@ -248,8 +248,10 @@ class TestCmdClear:
         assert "не найден" in call_args[0][0]
 
     @pytest.mark.asyncio
+    @patch("asyncio.sleep", new_callable=AsyncMock)
     async def test_cmd_clear_handles_database_error(
         self,
+        mock_sleep: AsyncMock,
         mock_message: Message,
         mock_fsm_context: FSMContext,
         mock_l10n: Localization,
@@ -277,6 +279,8 @@ class TestCmdClear:
         call_args = mock_message.answer.call_args
         # Проверяем, что показывается сообщение о временной ошибке
         assert "Временная ошибка БД" in call_args[0][0]
+        # Восстановимая ошибка не должна приводить к реальному ожиданию (backoff)
+        mock_sleep.assert_not_awaited()
 
     @pytest.mark.asyncio
     async def test_cmd_clear_message_format_for_specific_model(
@@ -7,167 +7,156 @@
 """
 
 import logging
-from unittest.mock import AsyncMock, MagicMock
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from typing import Any
+from unittest.mock import call
 
 import pytest
+import pytest_asyncio
 from aiogram.types import Message
-from aiogram.types import User as TelegramUser
 
 from src.bot.handlers.error import DebugError, cmd_error
 from src.utils.i18n import Localization
 
-
-@pytest.fixture
-def mock_message() -> Message:
-    """Создать мок-объект сообщения от Telegram."""
-    message = MagicMock(spec=Message)
-    message.from_user = MagicMock(spec=TelegramUser)
-    message.from_user.id = 123456789
-    message.from_user.username = "test_user"
-    message.answer = AsyncMock()
-    return message
-
-
-@pytest.fixture
-def mock_l10n() -> Localization:
-    """Создать мок-объект локализации."""
-    l10n = MagicMock(spec=Localization)
-
-    # Словарь переводов для тестов
-    translations = {
-        "error_test_triggered": (
-            "🔴 Тестовая ошибка успешно вызвана!\n\n"
-            "Это сообщение подтверждает, что:\n"
-            "• Команда /error работает\n"
-            "• Ошибка залогирована в терминале\n"
-            "• Система мониторинга уведомлена"
-        ),
-    }
-
-    def get_translation(key: str, **kwargs: str) -> str:
-        """Вернуть перевод с подставленными параметрами."""
-        text = translations.get(key, key)
-        if kwargs:
-            text = text.format(**kwargs)
-        return text
-
-    l10n.get = MagicMock(side_effect=get_translation)
-    return l10n
+# Все тесты модуля выполняются в одном воркере xdist (--dist loadgroup).
+pytestmark = pytest.mark.xdist_group(name="error_handler")
+
+
+@pytest.fixture(scope="module")
+def _handler_log_level() -> Iterator[None]:
+    """Включить DEBUG для логгера обработчика один раз на модуль.
+
+    caplog перехватывает записи через обработчик корневого логгера,
+    поэтому достаточно, чтобы логгер обработчика пропускал INFO/ERROR.
+    Это заменяет вызов caplog.set_level() в каждом тесте.
+
+    Фикстура не autouse: её подключают только тесты, проверяющие логи,
+    остальные не прогоняют INFO-записи через обработчики pytest.
+    """
+    logger = logging.getLogger("src.bot.handlers.error")
+    previous_level = logger.level
+    logger.setLevel(logging.DEBUG)
+    yield
+    logger.setLevel(previous_level)
+
+
+class _RecordCollector(logging.Handler):
+    """Обработчик логов, собирающий записи в список.
+
+    caplog доступен только в function-scope, поэтому для фикстуры
+    уровня модуля записи собираются этим обработчиком.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(level=logging.DEBUG)
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+@dataclass(frozen=True)
+class _CmdErrorRun:
+    """Снимок побочных эффектов одного вызова cmd_error."""
+
+    answer_texts: tuple[str, ...]
+    l10n_calls: tuple[Any, ...]
+    records: tuple[logging.LogRecord, ...]
+    # Отформатированные тексты записей — считаются один раз для всех тестов
+    log_messages: tuple[str, ...]
+
+
+@pytest_asyncio.fixture(scope="module")
+async def executed_cmd_error(
+    make_message: Callable[..., Any],
+    shared_l10n: Any,
+    _handler_log_level: None,
+) -> _CmdErrorRun:
+    """Выполнить /error один раз на модуль и вернуть снимок результата.
+
+    Тесты, которые только проверяют побочные эффекты стандартного вызова,
+    делают assert по этому снимку вместо повторного запуска обработчика.
+    Тесты, меняющие входные данные (from_user, username), вызывают
+    cmd_error сами.
+    """
+    message = make_message()
+    shared_l10n.get.reset_mock()
+    collector = _RecordCollector()
+    logger = logging.getLogger("src.bot.handlers.error")
+    logger.addHandler(collector)
+    try:
+        await cmd_error(message, shared_l10n)
+    finally:
+        logger.removeHandler(collector)
+
+    run = _CmdErrorRun(
+        answer_texts=tuple(args[0] for args, _ in message.answer.calls),
+        l10n_calls=tuple(shared_l10n.get.call_args_list),
+        records=tuple(collector.records),
+        log_messages=tuple(r.getMessage() for r in collector.records),
+    )
+    shared_l10n.get.reset_mock()
+    return run
 
 
 class TestCmdError:
     """Тесты для команды /error."""
 
-    @pytest.mark.asyncio
-    async def test_cmd_error_triggers_exception_and_logs_it(
+    def test_cmd_error_triggers_exception_and_logs_it(
         self,
-        mock_message: Message,
-        mock_l10n: Localization,
-        caplog: pytest.LogCaptureFixture,
+        executed_cmd_error: _CmdErrorRun,
     ) -> None:
         """Проверить, что /error вызывает исключение и логирует его."""
-        # Arrange
-        caplog.set_level(logging.INFO)
-
-        # Act
-        await cmd_error(mock_message, mock_l10n)
+        messages = executed_cmd_error.log_messages
+        assert any("Тестовая ошибка" in m for m in messages)
+        assert any("user_id=123456789" in m for m in messages)
 
-        # Assert
-        # Проверяем, что ошибка была залогирована
-        assert any("Тестовая ошибка" in record.message for record in caplog.records)
-        assert any("user_id=123456789" in record.message for record in caplog.records)
-
-    @pytest.mark.asyncio
-    async def test_cmd_error_sends_confirmation_message(
+    def test_cmd_error_sends_confirmation_message(
         self,
-        mock_message: Message,
-        mock_l10n: Localization,
+        executed_cmd_error: _CmdErrorRun,
     ) -> None:
         """Проверить, что /error отправляет сообщение пользователю."""
-        # Act
-        await cmd_error(mock_message, mock_l10n)
+        assert len(executed_cmd_error.answer_texts) == 1
+        assert "Тестовая ошибка успешно вызвана" in executed_cmd_error.answer_texts[0]
 
-        # Assert
-        mock_message.answer.assert_called_once()
-        call_args = mock_message.answer.call_args
-        assert "Тестовая ошибка успешно вызвана" in call_args[0][0]
-
-    @pytest.mark.asyncio
-    async def test_cmd_error_calls_l10n_get_with_correct_key(
+    def test_cmd_error_calls_l10n_get_with_correct_key(
         self,
-        mock_message: Message,
-        mock_l10n: Localization,
+        executed_cmd_error: _CmdErrorRun,
     ) -> None:
         """Проверить, что используется правильный ключ локализации."""
-        # Act
-        await cmd_error(mock_message, mock_l10n)
+        assert executed_cmd_error.l10n_calls == (call("error_test_triggered"),)
 
-        # Assert
-        mock_l10n.get.assert_called_once_with("error_test_triggered")
-
-    @pytest.mark.asyncio
-    async def test_cmd_error_logs_info_before_exception(
+    def test_cmd_error_logs_info_before_exception(
         self,
-        mock_message: Message,
-        mock_l10n: Localization,
-        caplog: pytest.LogCaptureFixture,
+        executed_cmd_error: _CmdErrorRun,
     ) -> None:
         """Проверить, что INFO лог записывается перед вызовом ошибки."""
-        # Arrange
-        caplog.set_level(logging.INFO)
-
-        # Act
-        await cmd_error(mock_message, mock_l10n)
-
-        # Assert
-        # Ищем INFO лог о вызове тестовой ошибки
-        info_logs = [r for r in caplog.records if r.levelno == logging.INFO]
         assert any(
-            "вызвал тестовую ошибку" in record.message for record in info_logs
+            "вызвал тестовую ошибку" in r.getMessage()
+            for r in executed_cmd_error.records
+            if r.levelno == logging.INFO
         ), "INFO лог о вызове тестовой ошибки не найден"
 
-    @pytest.mark.asyncio
-    async def test_cmd_error_logs_exception_with_traceback(
+    def test_cmd_error_logs_exception_with_traceback(
         self,
-        mock_message: Message,
-        mock_l10n: Localization,
-        caplog: pytest.LogCaptureFixture,
+        executed_cmd_error: _CmdErrorRun,
     ) -> None:
         """Проверить, что ошибка логируется с traceback."""
-        # Arrange
-        caplog.set_level(logging.ERROR)
-
-        # Act
-        await cmd_error(mock_message, mock_l10n)
-
-        # Assert
-        # Ищем ERROR лог с traceback
-        error_logs = [r for r in caplog.records if r.levelno == logging.ERROR]
-        assert len(error_logs) >= 1, "ERROR лог не найден"
-
-        # Проверяем, что есть exc_info (traceback)
-        assert any(r.exc_info is not None for r in error_logs), (
-            "ERROR лог без traceback"
-        )
+        # Ищем ERROR лог с exc_info (traceback)
+        assert any(
+            r.exc_info is not None
+            for r in executed_cmd_error.records
+            if r.levelno == logging.ERROR
+        ), "ERROR лог с traceback не найден"
 
-    @pytest.mark.asyncio
-    async def test_cmd_error_includes_username_in_logs(
+    def test_cmd_error_includes_username_in_logs(
         self,
-        mock_message: Message,
-        mock_l10n: Localization,
-        caplog: pytest.LogCaptureFixture,
+        executed_cmd_error: _CmdErrorRun,
     ) -> None:
         """Проверить, что username включён в логи."""
-        # Arrange
-        caplog.set_level(logging.INFO)
-
-        # Act
-        await cmd_error(mock_message, mock_l10n)
-
-        # Assert
-        assert any("test_user" in record.message for record in caplog.records)
+        assert any("test_user" in m for m in executed_cmd_error.log_messages)
 
-    @pytest.mark.asyncio
     async def test_cmd_error_handles_no_from_user(
         self,
         mock_message: Message,
@@ -184,7 +173,7 @@ class TestCmdError:
         # Команда всё равно должна отработать
         mock_message.answer.assert_called_once()
 
-    @pytest.mark.asyncio
+    @pytest.mark.usefixtures("_handler_log_level")
     async def test_cmd_error_handles_no_username(
         self,
         mock_message: Message,
@@ -194,7 +183,6 @@ class TestCmdError:
         """Проверить обработку пользователя без username."""
         # Arrange
         mock_message.from_user.username = None
-        caplog.set_level(logging.INFO)
 
         # Act
         await cmd_error(mock_message, mock_l10n)
@@ -208,23 +196,9 @@ class TestCmdError:
 class TestDebugError:
     """Тесты для класса DebugError."""
 
-    def test_debug_error_is_exception(self) -> None:
-        """Проверить, что DebugError является исключением."""
+    def test_debug_error_behavior(self) -> None:
+        """Проверить, что DebugError — исключение, которое можно выбросить и поймать."""
         assert issubclass(DebugError, Exception)
 
-    def test_debug_error_can_be_raised(self) -> None:
-        """Проверить, что DebugError можно выбросить."""
-        with pytest.raises(DebugError) as exc_info:
+        with pytest.raises(DebugError, match="Test message"):
             raise DebugError("Test message")
-
-        assert "Test message" in str(exc_info.value)
-
-    def test_debug_error_can_be_caught(self) -> None:
-        """Проверить, что DebugError можно поймать."""
-        caught = False
-        try:
-            raise DebugError("Test message")
-        except DebugError:
-            caught = True
-
-        assert caught
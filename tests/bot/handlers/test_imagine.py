@@ -8,14 +8,14 @@
 - FSM очищается после генерации
 """
 
-from collections.abc import Callable
+from collections.abc import Awaitable, Callable
 from contextlib import AbstractAsyncContextManager
-from unittest.mock import AsyncMock, MagicMock, patch
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
-from aiogram.types import User as TelegramUser
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.bot.handlers.imagine import (
@@ -25,130 +25,128 @@ from src.bot.handlers.imagine import (
 )
 from src.bot.states import ImagineStates
 from src.config.yaml_config import ModelConfig
-from src.db.models.user import User
 from src.providers.ai.base import GenerationResult, GenerationStatus
 from src.services.ai_service import AIService
 from src.services.billing_service import GenerationCost
 from src.utils.i18n import Localization
 
+# Все тесты модуля выполняются в одном воркере xdist (--dist loadgroup).
+pytestmark = pytest.mark.xdist_group(name="imagine_handlers")
+
+# MagicMock(spec=...) при создании разбирает весь класс aiogram/сервиса —
+# это самая дорогая часть фикстур. Поэтому spec-моки создаются один раз
+# при импорте модуля, а фикстуры сбрасывают их историю вызовов и заново
+# задают все атрибуты, которые тесты могут изменить.
+# copy.copy() здесь не подходит: поверхностная копия MagicMock делит с
+# оригиналом дочерние моки и историю вызовов.
+# Заглушки FSMContext и Localization — в tests/bot/handlers/conftest.py.
+# Message остаётся spec-моком: send_chat_action() проверяет
+# isinstance(message, Message), лёгкая заглушка из conftest не подходит.
+_MESSAGE_PROTOTYPE = MagicMock(spec=Message)
+_CALLBACK_PROTOTYPE = MagicMock(spec=CallbackQuery)
+_AI_SERVICE_PROTOTYPE = MagicMock(spec=AIService)
+
+# Конфигурация модели, результат генерации и стоимость не меняются
+# обработчиком, поэтому создаются один раз, а не заново в каждом тесте.
+_DALLE3_MODEL_CONFIG = ModelConfig(
+    provider="openai",
+    model_id="openai/dall-e-3",
+    generation_type="image",
+    display_name="DALL-E 3",
+    price_tokens=50,
+)
+_DEFAULT_GEN_RESULT = GenerationResult(
+    status=GenerationStatus.SUCCESS,
+    content="https://example.com/generated-image.png",
+)
+_BILLING_COST = GenerationCost(
+    can_proceed=True, tokens_cost=50, model_key="dall-e-3", quantity=1.0
+)
+
 
 @pytest.fixture
-def mock_message() -> Message:
+def mock_message(shared_async_mock: Callable[..., AsyncMock]) -> Message:
     """Создать мок-объект сообщения от Telegram."""
-    message = MagicMock(spec=Message)
-    message.from_user = MagicMock(spec=TelegramUser)
-    message.from_user.id = 123456789
-    message.from_user.username = "test_user"
+    message = _MESSAGE_PROTOTYPE
+    message.reset_mock()
+    # Обработчик только читает from_user и chat — достаточно SimpleNamespace
+    message.from_user = SimpleNamespace(id=123456789, username="test_user")
     message.text = "Кот в космосе"
-    message.answer = AsyncMock()
-    message.answer_photo = AsyncMock()
+    message.answer = shared_async_mock("imagine.message.answer")
+    message.answer_photo = shared_async_mock("imagine.message.answer_photo")
+    message.edit_text = shared_async_mock("imagine.message.edit_text")
 
     # Атрибут chat нужен для send_chat_action
-    message.chat = MagicMock()
-    message.chat.id = 123456789
-    message.chat.bot = MagicMock()
-    message.chat.bot.send_chat_action = AsyncMock()
+    message.chat = SimpleNamespace(
+        id=123456789,
+        bot=SimpleNamespace(
+            send_chat_action=shared_async_mock("imagine.chat.send_chat_action")
+        ),
+    )
 
     return message
 
 
 @pytest.fixture
-def mock_callback_query(mock_message: Message) -> CallbackQuery:
+def mock_callback_query(
+    mock_message: Message,
+    shared_async_mock: Callable[..., AsyncMock],
+) -> CallbackQuery:
     """Создать мок-объект callback query от Telegram."""
-    callback = MagicMock(spec=CallbackQuery)
+    callback = _CALLBACK_PROTOTYPE
+    callback.reset_mock()
     callback.from_user = mock_message.from_user
     callback.message = mock_message
     callback.data = "model:dall-e-3"
-    callback.answer = AsyncMock()
-    mock_message.edit_text = AsyncMock()
+    callback.answer = shared_async_mock("imagine.callback.answer")
     return callback
 
 
 @pytest.fixture
-def mock_fsm_context() -> FSMContext:
-    """Создать мок-объект FSM контекста."""
-    context = MagicMock(spec=FSMContext)
-    context.set_state = AsyncMock()
-    context.update_data = AsyncMock()
-    context.get_data = AsyncMock(return_value={"model_key": "dall-e-3"})
-    context.get_state = AsyncMock(return_value=ImagineStates.waiting_for_prompt)
-    context.clear = AsyncMock()
-    return context
+def processing_msg(
+    mock_message: Message,
+    shared_async_mock: Callable[..., AsyncMock],
+) -> MagicMock:
+    """Сообщение "Генерирую...", которое возвращает mock_message.answer()."""
+    message = MagicMock()
+    message.delete = shared_async_mock("imagine.processing_msg.delete")
+    message.edit_text = shared_async_mock("imagine.processing_msg.edit_text")
+    mock_message.answer.return_value = message
+    return message
 
 
 @pytest.fixture
-def mock_ai_service() -> AIService:
+def mock_fsm_context(mock_fsm_context: FSMContext) -> FSMContext:
+    """Общий мок FSMContext в состоянии ожидания промпта для dall-e-3."""
+    mock_fsm_context.get_data.return_value = {"model_key": "dall-e-3"}
+    mock_fsm_context.get_state.return_value = ImagineStates.waiting_for_prompt
+    return mock_fsm_context
+
+
+@pytest.fixture
+def mock_ai_service(shared_async_mock: Callable[..., AsyncMock]) -> AIService:
     """Создать мок-объект AI сервиса."""
-    service = MagicMock(spec=AIService)
-    service.generate = AsyncMock(
-        return_value=GenerationResult(
-            status=GenerationStatus.SUCCESS,
-            content="https://example.com/generated-image.png",
-        )
+    service = _AI_SERVICE_PROTOTYPE
+    service.reset_mock()
+    service.generate = shared_async_mock(
+        "imagine.ai_service.generate", return_value=_DEFAULT_GEN_RESULT
     )
     # Добавляем get_available_models() с одной image-моделью
     service.get_available_models = MagicMock(
-        return_value={
-            "dall-e-3": ModelConfig(
-                provider="openai",
-                model_id="openai/dall-e-3",
-                generation_type="image",
-                display_name="DALL-E 3",
-                price_tokens=50,
-            ),
-        }
+        return_value={"dall-e-3": _DALLE3_MODEL_CONFIG}
     )
     return service
 
 
 @pytest.fixture
 def mock_billing_cost() -> GenerationCost:
-    """Создать мок GenerationCost для успешного биллинга."""
-    return GenerationCost(
-        can_proceed=True, tokens_cost=50, model_key="dall-e-3", quantity=1.0
-    )
-
-
-@pytest.fixture
-def mock_l10n() -> Localization:
-    """Создать мок-объект локализации.
-
-    Возвращает переводы на русском языке для тестирования.
-    Метод get() возвращает строку с подставленными параметрами.
-    """
-    l10n = MagicMock(spec=Localization)
-
-    # Словарь переводов для тестов
-    translations = {
-        "imagine_choose_model": "🎨 <b>Выберите модель для генерации:</b>",
-        "imagine_model_selected": "✅ Модель выбрана: <b>{model_key}</b>",
-        "imagine_model_not_selected": "❌ Модель не выбрана.",
-        "imagine_generating": "⏳ Генерирую изображение...",
-        "imagine_generated": "🎨 Изображение сгенерировано моделью {model_key}",
-        "imagine_empty_response": "❌ AI вернул пустой ответ.",
-        "imagine_generation_error": "❌ Ошибка генерации: {error}",
-        "imagine_unexpected_error": "❌ Произошла неожиданная ошибка.",
-        "error_user_not_found": "❌ Ошибка: пользователь не найден.",
-        "error_db_temporary": "❌ Временная ошибка БД.",
-        "error_db_permanent": "❌ Ошибка при работе с базой данных.",
-        "no_models_available": "❌ Модели недоступны",
-    }
-
-    def get_translation(key: str, **kwargs: str) -> str:
-        """Вернуть перевод с подставленными параметрами."""
-        text = translations.get(key, key)
-        if kwargs:
-            text = text.format(**kwargs)
-        return text
-
-    l10n.get = MagicMock(side_effect=get_translation)
-    return l10n
+    """GenerationCost для успешного биллинга."""
+    return _BILLING_COST
 
 
 class TestCmdImagine:
     """Тесты для команды /imagine."""
 
-    @pytest.mark.asyncio
     async def test_cmd_imagine_shows_model_selection(
         self,
         mock_message: Message,
@@ -171,7 +169,6 @@ class TestCmdImagine:
         call_args = mock_message.answer.call_args
         assert "Выберите модель" in call_args[0][0]
 
-    @pytest.mark.asyncio
     async def test_cmd_imagine_no_available_models(
         self,
         mock_message: Message,
@@ -194,31 +191,40 @@ class TestCmdImagine:
         mock_message.answer.assert_called_once()
         mock_l10n.get.assert_called_with("no_models_available")
 
-    @pytest.mark.asyncio
-    async def test_cmd_imagine_without_from_user(
+
+class TestHandlersWithoutFromUser:
+    """Тесты раннего выхода обработчиков сообщений без from_user."""
+
+    @pytest.mark.parametrize(
+        "handler",
+        [cmd_imagine, handle_user_prompt],
+        ids=["cmd_imagine", "handle_user_prompt"],
+    )
+    async def test_handler_without_from_user_does_nothing(
         self,
+        handler: Callable[..., Awaitable[None]],
         mock_message: Message,
         mock_fsm_context: FSMContext,
         mock_l10n: Localization,
         mock_ai_service: AIService,
     ) -> None:
-        """Проверить, что обработчик корректно обрабатывает отсутствие from_user."""
+        """Проверить, что без from_user обработчик ничего не делает."""
         # Arrange
         mock_message.from_user = None
 
         # Act
-        await cmd_imagine(mock_message, mock_fsm_context, mock_l10n, mock_ai_service)
+        await handler(mock_message, mock_fsm_context, mock_l10n, mock_ai_service)
 
         # Assert
         # Не должно быть вызовов
         mock_fsm_context.set_state.assert_not_called()
         mock_message.answer.assert_not_called()
+        mock_ai_service.generate.assert_not_called()
 
 
 class TestHandleModelSelection:
     """Тесты для обработчика выбора модели."""
 
-    @pytest.mark.asyncio
     async def test_handle_model_selection_saves_model_key(
         self,
         mock_callback_query: CallbackQuery,
@@ -232,7 +238,6 @@ class TestHandleModelSelection:
         # Assert
         mock_fsm_context.update_data.assert_called_once_with(model_key="dall-e-3")
 
-    @pytest.mark.asyncio
     async def test_handle_model_selection_changes_state(
         self,
         mock_callback_query: CallbackQuery,
@@ -248,7 +253,6 @@ class TestHandleModelSelection:
             ImagineStates.waiting_for_prompt
         )
 
-    @pytest.mark.asyncio
     async def test_handle_model_selection_edits_message(
         self,
         mock_callback_query: CallbackQuery,
@@ -266,7 +270,6 @@ class TestHandleModelSelection:
         assert "Модель выбрана" in call_args[0][0]
         assert "dall-e-3" in call_args[0][0]
 
-    @pytest.mark.asyncio
     async def test_handle_model_selection_answers_callback(
         self,
         mock_callback_query: CallbackQuery,
@@ -280,7 +283,6 @@ class TestHandleModelSelection:
         # Assert
         mock_callback_query.answer.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_handle_model_selection_without_callback_data(
         self,
         mock_callback_query: CallbackQuery,
@@ -301,38 +303,31 @@ class TestHandleModelSelection:
 class TestHandleUserPrompt:
     """Тесты для обработчика промпта пользователя."""
 
-    @pytest.mark.asyncio
+    @pytest.mark.usefixtures("test_user", "processing_msg")
     async def test_handle_user_prompt_generates_and_sends_image(
         self,
         mock_message: Message,
         mock_fsm_context: FSMContext,
         mock_l10n: Localization,
         mock_ai_service: AIService,
-        db_session: AsyncSession,
-        test_user: User,
         session_factory: Callable[[], AbstractAsyncContextManager[AsyncSession]],
         mock_billing_cost: GenerationCost,
+        monkeypatch: pytest.MonkeyPatch,
     ) -> None:
         """Проверить, что изображение генерируется и отправляется пользователю."""
-        # Arrange
-        processing_msg = MagicMock()
-        processing_msg.delete = AsyncMock()
-        processing_msg.edit_text = AsyncMock()
-        mock_message.answer = AsyncMock(return_value=processing_msg)
-
         # Act
-        with patch(
+        monkeypatch.setattr(
             "src.bot.utils.billing.check_billing_and_show_error",
-            return_value=mock_billing_cost,
-        ):
-            with patch("src.bot.utils.billing.charge_after_delivery"):
-                await handle_user_prompt(
-                    mock_message,
-                    mock_fsm_context,
-                    mock_l10n,
-                    mock_ai_service,
-                    session_factory,
-                )
+            AsyncMock(return_value=mock_billing_cost),
+        )
+        monkeypatch.setattr("src.bot.utils.billing.charge_after_delivery", AsyncMock())
+        await handle_user_prompt(
+            mock_message,
+            mock_fsm_context,
+            mock_l10n,
+            mock_ai_service,
+            session_factory,
+        )
 
         # Assert
         # AI сервис должен быть вызван через ImageGenerationService
@@ -347,7 +342,6 @@ class TestHandleUserPrompt:
         # FSM должен быть очищен
         mock_fsm_context.clear.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_handle_user_prompt_without_model_key_in_state(
         self,
         mock_message: Message,
@@ -370,47 +364,22 @@ class TestHandleUserPrompt:
         assert "модель не выбрана" in call_args[0][0].lower()
         mock_ai_service.generate.assert_not_called()
 
-    @pytest.mark.asyncio
-    async def test_handle_user_prompt_without_from_user(
-        self,
-        mock_message: Message,
-        mock_fsm_context: FSMContext,
-        mock_l10n: Localization,
-        mock_ai_service: AIService,
-    ) -> None:
-        """Проверить обработку отсутствия from_user."""
-        # Arrange
-        mock_message.from_user = None
-
-        # Act
-        await handle_user_prompt(
-            mock_message, mock_fsm_context, mock_l10n, mock_ai_service
-        )
-
-        # Assert
-        mock_message.answer.assert_not_called()
-
-    @pytest.mark.asyncio
+    @pytest.mark.usefixtures("test_user")
     async def test_handle_user_prompt_handles_generation_error(
         self,
         mock_message: Message,
         mock_fsm_context: FSMContext,
         mock_l10n: Localization,
         mock_ai_service: AIService,
-        db_session: AsyncSession,
-        test_user: User,
         session_factory: Callable[[], AbstractAsyncContextManager[AsyncSession]],
         mock_billing_cost: GenerationCost,
+        processing_msg: MagicMock,
+        monkeypatch: pytest.MonkeyPatch,
     ) -> None:
         """Проверить обработку ошибки генерации AI."""
         # Arrange
         from src.core.exceptions import GenerationError
 
-        processing_msg = MagicMock()
-        processing_msg.edit_text = AsyncMock()
-        processing_msg.delete = AsyncMock()
-        mock_message.answer = AsyncMock(return_value=processing_msg)
-
         mock_ai_service.generate = AsyncMock(
             side_effect=GenerationError(
                 "Таймаут API",
@@ -420,17 +389,17 @@ class TestHandleUserPrompt:
         )
 
         # Act
-        with patch(
+        monkeypatch.setattr(
             "src.bot.utils.billing.check_billing_and_show_error",
-            return_value=mock_billing_cost,
-        ):
-            await handle_user_prompt(
-                mock_message,
-                mock_fsm_context,
-                mock_l10n,
-                mock_ai_service,
-                session_factory,
-            )
+            AsyncMock(return_value=mock_billing_cost),
+        )
+        await handle_user_prompt(
+            mock_message,
+            mock_fsm_context,
+            mock_l10n,
+            mock_ai_service,
+            session_factory,
+        )
 
         # Assert
         # ImageGenerationService обрабатывает ошибку и показывает сообщение
@@ -445,25 +414,20 @@ class TestHandleUserPrompt:
         # FSM НЕ должен быть очищен при ошибке
         mock_fsm_context.clear.assert_not_called()
 
-    @pytest.mark.asyncio
+    @pytest.mark.usefixtures("test_user")
     async def test_handle_user_prompt_handles_empty_ai_response(
         self,
         mock_message: Message,
         mock_fsm_context: FSMContext,
         mock_l10n: Localization,
         mock_ai_service: AIService,
-        db_session: AsyncSession,
-        test_user: User,
         session_factory: Callable[[], AbstractAsyncContextManager[AsyncSession]],
         mock_billing_cost: GenerationCost,
+        processing_msg: MagicMock,
+        monkeypatch: pytest.MonkeyPatch,
     ) -> None:
         """Проверить обработку пустого ответа от AI."""
         # Arrange
-        processing_msg = MagicMock()
-        processing_msg.edit_text = AsyncMock()
-        processing_msg.delete = AsyncMock()
-        mock_message.answer = AsyncMock(return_value=processing_msg)
-
         mock_ai_service.generate = AsyncMock(
             return_value=GenerationResult(
                 status=GenerationStatus.SUCCESS,
@@ -472,17 +436,17 @@ class TestHandleUserPrompt:
         )
 
         # Act
-        with patch(
+        monkeypatch.setattr(
             "src.bot.utils.billing.check_billing_and_show_error",
-            return_value=mock_billing_cost,
-        ):
-            await handle_user_prompt(
-                mock_message,
-                mock_fsm_context,
-                mock_l10n,
-                mock_ai_service,
-                session_factory,
-            )
+            AsyncMock(return_value=mock_billing_cost),
+        )
+        await handle_user_prompt(
+            mock_message,
+            mock_fsm_context,
+            mock_l10n,
+            mock_ai_service,
+            session_factory,
+        )
 
         # Assert
         # ImageGenerationService обрабатывает пустой ответ и показывает ошибку
@@ -497,38 +461,32 @@ class TestHandleUserPrompt:
         # FSM НЕ должен быть очищен при ошибке
         mock_fsm_context.clear.assert_not_called()
 
-    @pytest.mark.asyncio
+    @pytest.mark.usefixtures("test_user")
     async def test_handle_user_prompt_deletes_processing_message(
         self,
         mock_message: Message,
         mock_fsm_context: FSMContext,
         mock_l10n: Localization,
         mock_ai_service: AIService,
-        db_session: AsyncSession,
-        test_user: User,
         session_factory: Callable[[], AbstractAsyncContextManager[AsyncSession]],
         mock_billing_cost: GenerationCost,
+        processing_msg: MagicMock,
+        monkeypatch: pytest.MonkeyPatch,
     ) -> None:
         """Проверить, что сообщение 'Генерирую...' удаляется после генерации."""
-        # Arrange
-        processing_msg = MagicMock()
-        processing_msg.delete = AsyncMock()
-        processing_msg.edit_text = AsyncMock()
-        mock_message.answer = AsyncMock(return_value=processing_msg)
-
         # Act
-        with patch(
+        monkeypatch.setattr(
             "src.bot.utils.billing.check_billing_and_show_error",
-            return_value=mock_billing_cost,
-        ):
-            with patch("src.bot.utils.billing.charge_after_delivery"):
-                await handle_user_prompt(
-                    mock_message,
-                    mock_fsm_context,
-                    mock_l10n,
-                    mock_ai_service,
-                    session_factory,
-                )
+            AsyncMock(return_value=mock_billing_cost),
+        )
+        monkeypatch.setattr("src.bot.utils.billing.charge_after_delivery", AsyncMock())
+        await handle_user_prompt(
+            mock_message,
+            mock_fsm_context,
+            mock_l10n,
+            mock_ai_service,
+            session_factory,
+        )
 
         # Assert
         processing_msg.delete.assert_called_once()
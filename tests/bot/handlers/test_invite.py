@@ -16,98 +16,155 @@
 6. Обработка ошибок БД
 """
 
-from unittest.mock import AsyncMock, MagicMock, patch
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Any
+from unittest.mock import DEFAULT, AsyncMock, MagicMock, patch
 
 import pytest
-from aiogram import Bot
-from aiogram.types import Message, User
 from sqlalchemy.exc import SQLAlchemyError
 
+from src.bot.handlers import invite
 from src.bot.handlers.invite import cmd_invite
-from src.db.models.user import User as DbUser
 from src.services.referral_service import ReferralStats
-from src.utils.i18n import Localization
+
+# Все тесты модуля выполняются в одном воркере xdist (--dist loadgroup).
+pytestmark = pytest.mark.xdist_group(name="invite_handlers")
 
 # =============================================================================
 # ФИКСТУРЫ
 # =============================================================================
 
+# Заглушки Message, Bot и Localization — в tests/bot/handlers/conftest.py.
+
+# Статистика рефералов обработчиком не меняется — создаётся один раз на модуль.
+_REFERRAL_STATS = ReferralStats(
+    total_referrals=5,
+    total_earnings=250,
+    pending_bonuses=0,
+    max_earnings=5000,
+    inviter_bonus=50,
+    can_earn_more=True,
+)
+# Есть невыплаченные бонусы (require_payment=True)
+_STATS_PENDING = ReferralStats(
+    total_referrals=10,
+    total_earnings=400,
+    pending_bonuses=3,
+    max_earnings=5000,
+    inviter_bonus=50,
+    can_earn_more=True,
+)
+# Достигнут лимит заработка max_earnings
+_STATS_MAX = ReferralStats(
+    total_referrals=100,
+    total_earnings=5000,
+    pending_bonuses=0,
+    max_earnings=5000,
+    inviter_bonus=50,
+    can_earn_more=False,
+)
+
+
+@pytest.fixture(scope="module")
+def mock_referral_stats() -> ReferralStats:
+    """Статистика рефералов (см. _REFERRAL_STATS)."""
+    return _REFERRAL_STATS
 
-@pytest.fixture
-def mock_message() -> MagicMock:
-    """Мок Message с пользователем."""
-    message = MagicMock(spec=Message)
-    message.from_user = User(
-        id=123456789,
-        is_bot=False,
-        first_name="Test User",
-        username="testuser",
-        language_code="ru",
-    )
-    message.answer = AsyncMock()
-    return message
 
+_INVITE_LINK = "https://t.me/bot?start=ref_1"
 
-@pytest.fixture
-def mock_bot() -> MagicMock:
-    """Мок Bot с username."""
-    bot = MagicMock(spec=Bot)
-    bot_me = MagicMock()
-    bot_me.username = "test_bot"
-    bot.get_me = AsyncMock(return_value=bot_me)
-    return bot
 
+@pytest.fixture(scope="module")
+def make_service() -> Callable[..., MagicMock]:
+    """Фабрика мока ReferralService.
 
-@pytest.fixture
-def mock_l10n() -> MagicMock:
-    """Мок Localization."""
-    l10n = MagicMock(spec=Localization)
-
-    def get_translation(key: str, **kwargs: dict[str, str]) -> str:
-        translations = {
-            "invite_disabled": "Реферальная программа отключена",
-            "error_user_not_found": "Пользователь не найден в БД",
-            "error_unknown": "Произошла неизвестная ошибка",
-            "invite_info": (
-                "Ваша реферальная ссылка: {link}\n\n"
-                "Приглашено: {total_referrals}\n"
-                "Заработано: {total_earnings}\n"
-                "Бонус за реферала: {inviter_bonus}\n"
-                "Максимум: {max_earnings}"
-            ),
-            "invite_pending_bonuses": "Невыплаченных бонусов: {count}",
-            "invite_max_reached": "Достигнут максимальный лимит заработка",
-        }
-        text = translations.get(key, key)
-        if kwargs:
-            return text.format(**kwargs)
-        return text
+    По умолчанию программа включена, сервис возвращает _REFERRAL_STATS
+    и ссылку _INVITE_LINK. Тест переопределяет только нужный параметр:
+    make_service(enabled=False) или make_service(stats=...).
+    """
 
-    l10n.get.side_effect = get_translation
-    return l10n
+    def _make_service(
+        *,
+        enabled: bool = True,
+        stats: ReferralStats = _REFERRAL_STATS,
+        link: str = _INVITE_LINK,
+    ) -> MagicMock:
+        service = MagicMock()
+        service.is_enabled.return_value = enabled
+        service.get_referral_stats = AsyncMock(return_value=stats)
+        service.get_invite_link.return_value = link
+        return service
 
+    return _make_service
 
-@pytest.fixture
-def mock_db_user() -> MagicMock:
-    """Мок DB User."""
-    user = MagicMock(spec=DbUser)
-    user.id = 1
-    user.telegram_id = 123456789
-    user.username = "testuser"
-    return user
+
+@pytest.fixture(scope="session")
+def invite_module() -> ModuleType:
+    """Модуль обработчика /invite.
+
+    patch.multiple() получает сам модуль, а не строку
+    "src.bot.handlers.invite", и не разбирает путь при каждом тесте.
+    """
+    return invite
+
+
+@dataclass
+class _InvitePatches:
+    """Моки зависимостей модуля src.bot.handlers.invite."""
+
+    session_cls: MagicMock
+    create_service: MagicMock
+    user_repo_cls: MagicMock
+    logger: MagicMock
+    service: MagicMock
+    repo: MagicMock
 
 
 @pytest.fixture
-def mock_referral_stats() -> ReferralStats:
-    """Мок статистики рефералов."""
-    return ReferralStats(
-        total_referrals=5,
-        total_earnings=250,
-        pending_bonuses=0,
-        max_earnings=5000,
-        inviter_bonus=50,
-        can_earn_more=True,
+def invite_patches(
+    mock_db_user: Any,
+    mock_referral_stats: ReferralStats,
+    make_service: Callable[..., MagicMock],
+    db_session_cm: Any,
+    invite_module: ModuleType,
+) -> Iterator[_InvitePatches]:
+    """Подменить зависимости обработчика /invite одним patch.multiple().
+
+    По умолчанию реферальная программа включена, пользователь найден
+    (mock_db_user), сервис возвращает mock_referral_stats и ссылку
+    _INVITE_LINK. Тест меняет только то, что проверяет, например
+    invite_patches.create_service.return_value = make_service(enabled=False).
+    """
+    patcher = patch.multiple(
+        invite_module,
+        DatabaseSession=DEFAULT,
+        create_referral_service=DEFAULT,
+        UserRepository=DEFAULT,
+        logger=DEFAULT,
+    )
+    mocks = patcher.start()
+
+    session_cls = mocks["DatabaseSession"]
+    session_cls.return_value = db_session_cm
+
+    service = make_service(stats=mock_referral_stats)
+    mocks["create_referral_service"].return_value = service
+
+    repo = MagicMock()
+    repo.get_by_telegram_id = AsyncMock(return_value=mock_db_user)
+    mocks["UserRepository"].return_value = repo
+
+    yield _InvitePatches(
+        session_cls=session_cls,
+        create_service=mocks["create_referral_service"],
+        user_repo_cls=mocks["UserRepository"],
+        logger=mocks["logger"],
+        service=service,
+        repo=repo,
     )
+    patcher.stop()
 
 
 # =============================================================================
@@ -118,520 +175,193 @@ def mock_referral_stats() -> ReferralStats:
 class TestCmdInvite:
     """Тесты для обработчика команды /invite."""
 
-    @pytest.mark.asyncio
     async def test_cmd_invite_handles_message_without_user(
         self,
+        mock_message: MagicMock,
         mock_l10n: MagicMock,
         mock_bot: MagicMock,
+        invite_patches: _InvitePatches,
     ) -> None:
         """Проверить обработку сообщения без from_user."""
         # Arrange
-        message = MagicMock(spec=Message)
-        message.from_user = None
+        mock_message.from_user = None
 
-        with patch("src.bot.handlers.invite.logger") as mock_logger:
-            # Act
-            await cmd_invite(message, mock_l10n, mock_bot)
+        # Act
+        await cmd_invite(mock_message, mock_l10n, mock_bot)
 
-            # Assert
-            mock_logger.warning.assert_called_once()
-            assert "без from_user" in mock_logger.warning.call_args[0][0]
+        # Assert
+        invite_patches.logger.warning.assert_called_once()
+        assert "без from_user" in invite_patches.logger.warning.call_args[0][0]
 
-    @pytest.mark.asyncio
     async def test_cmd_invite_referral_disabled_shows_message(
         self,
         mock_message: MagicMock,
         mock_l10n: MagicMock,
         mock_bot: MagicMock,
+        invite_patches: _InvitePatches,
+        make_service: Callable[..., MagicMock],
     ) -> None:
         """Проверить сообщение когда реферальная программа отключена."""
         # Arrange
-        with (
-            patch("src.bot.handlers.invite.DatabaseSession") as mock_session_cls,
-            patch(
-                "src.bot.handlers.invite.create_referral_service"
-            ) as mock_service_cls,
-        ):
-            mock_session = AsyncMock()
-            mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-            mock_service = MagicMock()
-            mock_service.is_enabled = MagicMock(return_value=False)
-            mock_service_cls.return_value = mock_service
-
-            # Act
-            await cmd_invite(mock_message, mock_l10n, mock_bot)
-
-            # Assert
-            mock_message.answer.assert_called_once_with(
-                "Реферальная программа отключена"
-            )
-
-    @pytest.mark.asyncio
+        invite_patches.create_service.return_value = make_service(enabled=False)
+
+        # Act
+        await cmd_invite(mock_message, mock_l10n, mock_bot)
+
+        # Assert
+        mock_message.answer.assert_called_once_with("Реферальная программа отключена")
+
     async def test_cmd_invite_user_not_found_shows_error(
         self,
         mock_message: MagicMock,
         mock_l10n: MagicMock,
         mock_bot: MagicMock,
+        invite_patches: _InvitePatches,
     ) -> None:
         """Проверить ошибку когда пользователь не найден в БД."""
         # Arrange
-        with (
-            patch("src.bot.handlers.invite.DatabaseSession") as mock_session_cls,
-            patch(
-                "src.bot.handlers.invite.create_referral_service"
-            ) as mock_service_cls,
-            patch("src.bot.handlers.invite.UserRepository") as mock_repo_cls,
-            patch("src.bot.handlers.invite.logger") as mock_logger,
-        ):
-            mock_session = AsyncMock()
-            mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-            mock_service = MagicMock()
-            mock_service.is_enabled = MagicMock(return_value=True)
-            mock_service_cls.return_value = mock_service
-
-            mock_repo = MagicMock()
-            mock_repo.get_by_telegram_id = AsyncMock(return_value=None)
-            mock_repo_cls.return_value = mock_repo
-
-            # Act
-            await cmd_invite(mock_message, mock_l10n, mock_bot)
-
-            # Assert
-            mock_logger.error.assert_called_once()
-            mock_message.answer.assert_called_once_with("Пользователь не найден в БД")
-
-    @pytest.mark.asyncio
-    async def test_cmd_invite_shows_stats_and_link(
+        invite_patches.repo.get_by_telegram_id.return_value = None
+
+        # Act
+        await cmd_invite(mock_message, mock_l10n, mock_bot)
+
+        # Assert
+        invite_patches.logger.error.assert_called_once()
+        mock_message.answer.assert_called_once_with("Пользователь не найден в БД")
+
+    @pytest.mark.parametrize(
+        ("stats", "must_contain", "must_not_contain"),
+        [
+            pytest.param(
+                _REFERRAL_STATS,
+                (
+                    _INVITE_LINK,
+                    "Приглашено: 5",
+                    "Заработано: 250",
+                    "Бонус за реферала: 50",
+                    "Максимум: 5000",
+                ),
+                # can_earn_more=True, pending_bonuses=0
+                ("Достигнут максимальный лимит заработка", "Невыплаченных бонусов"),
+                id="stats_and_link",
+            ),
+            pytest.param(
+                _STATS_PENDING,
+                ("Невыплаченных бонусов: 3",),
+                ("Достигнут максимальный лимит заработка",),
+                id="pending_bonuses",
+            ),
+            pytest.param(
+                _STATS_MAX,
+                ("Достигнут максимальный лимит заработка",),
+                ("Невыплаченных бонусов",),
+                id="max_reached",
+            ),
+        ],
+    )
+    async def test_cmd_invite_shows_stats(
         self,
         mock_message: MagicMock,
         mock_l10n: MagicMock,
         mock_bot: MagicMock,
-        mock_db_user: MagicMock,
-        mock_referral_stats: ReferralStats,
+        invite_patches: _InvitePatches,
+        make_service: Callable[..., MagicMock],
+        stats: ReferralStats,
+        must_contain: tuple[str, ...],
+        must_not_contain: tuple[str, ...],
     ) -> None:
-        """Проверить отображение статистики и реферальной ссылки."""
+        """Проверить текст со статистикой, ссылкой и предупреждениями."""
         # Arrange
-        with (
-            patch("src.bot.handlers.invite.DatabaseSession") as mock_session_cls,
-            patch(
-                "src.bot.handlers.invite.create_referral_service"
-            ) as mock_service_cls,
-            patch("src.bot.handlers.invite.UserRepository") as mock_repo_cls,
-        ):
-            mock_session = AsyncMock()
-            mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-            mock_service = MagicMock()
-            mock_service.is_enabled = MagicMock(return_value=True)
-            mock_service.get_referral_stats = AsyncMock(
-                return_value=mock_referral_stats
-            )
-            mock_service.get_invite_link = MagicMock(
-                return_value="https://t.me/test_bot?start=ref_123456789"
-            )
-            mock_service_cls.return_value = mock_service
-
-            mock_repo = MagicMock()
-            mock_repo.get_by_telegram_id = AsyncMock(return_value=mock_db_user)
-            mock_repo_cls.return_value = mock_repo
-
-            # Act
-            await cmd_invite(mock_message, mock_l10n, mock_bot)
-
-            # Assert
-            mock_message.answer.assert_called_once()
-            response = mock_message.answer.call_args[0][0]
-            assert "https://t.me/test_bot?start=ref_123456789" in response
-            assert "5" in response  # total_referrals
-            assert "250" in response  # total_earnings
-            assert "50" in response  # inviter_bonus
-            assert "5000" in response  # max_earnings
-
-    @pytest.mark.asyncio
-    async def test_cmd_invite_shows_pending_bonuses_info(
+        invite_patches.create_service.return_value = make_service(stats=stats)
+
+        # Act
+        await cmd_invite(mock_message, mock_l10n, mock_bot)
+
+        # Assert
+        mock_message.answer.assert_called_once()
+        response = mock_message.answer.call_args[0][0]
+        for text in must_contain:
+            assert text in response
+        for text in must_not_contain:
+            assert text not in response
+
+    @pytest.mark.parametrize(
+        "error",
+        [
+            pytest.param(SQLAlchemyError("DB Error"), id="sqlalchemy_error"),
+            pytest.param(OSError("Connection Error"), id="os_error"),
+        ],
+    )
+    async def test_cmd_invite_handles_infra_error(
         self,
         mock_message: MagicMock,
         mock_l10n: MagicMock,
         mock_bot: MagicMock,
-        mock_db_user: MagicMock,
+        invite_patches: _InvitePatches,
+        error: Exception,
     ) -> None:
-        """Проверить отображение информации о невыплаченных бонусах."""
+        """Проверить обработку ошибок БД (SQLAlchemyError) и подключения (OSError)."""
         # Arrange
-        stats_with_pending = ReferralStats(
-            total_referrals=10,
-            total_earnings=400,
-            pending_bonuses=3,  # Есть невыплаченные бонусы
-            max_earnings=5000,
-            inviter_bonus=50,
-            can_earn_more=True,
-        )
+        # Ошибка возникает при обращении к UserRepository
+        invite_patches.user_repo_cls.side_effect = error
 
-        with (
-            patch("src.bot.handlers.invite.DatabaseSession") as mock_session_cls,
-            patch(
-                "src.bot.handlers.invite.create_referral_service"
-            ) as mock_service_cls,
-            patch("src.bot.handlers.invite.UserRepository") as mock_repo_cls,
-        ):
-            mock_session = AsyncMock()
-            mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-            mock_service = MagicMock()
-            mock_service.is_enabled = MagicMock(return_value=True)
-            mock_service.get_referral_stats = AsyncMock(return_value=stats_with_pending)
-            mock_service.get_invite_link = MagicMock(
-                return_value="https://t.me/bot?start=ref_1"
-            )
-            mock_service_cls.return_value = mock_service
-
-            mock_repo = MagicMock()
-            mock_repo.get_by_telegram_id = AsyncMock(return_value=mock_db_user)
-            mock_repo_cls.return_value = mock_repo
-
-            # Act
-            await cmd_invite(mock_message, mock_l10n, mock_bot)
-
-            # Assert
-            response = mock_message.answer.call_args[0][0]
-            assert "Невыплаченных бонусов: 3" in response
-
-    @pytest.mark.asyncio
-    async def test_cmd_invite_shows_max_reached_warning(
-        self,
-        mock_message: MagicMock,
-        mock_l10n: MagicMock,
-        mock_bot: MagicMock,
-        mock_db_user: MagicMock,
-    ) -> None:
-        """Проверить предупреждение о достижении лимита заработка."""
-        # Arrange
-        stats_max_reached = ReferralStats(
-            total_referrals=100,
-            total_earnings=5000,
-            pending_bonuses=0,
-            max_earnings=5000,
-            inviter_bonus=50,
-            can_earn_more=False,  # Достигнут лимит
-        )
+        # Act
+        await cmd_invite(mock_message, mock_l10n, mock_bot)
+
+        # Assert
+        invite_patches.logger.exception.assert_called_once()
+        mock_message.answer.assert_called_once_with("Произошла неизвестная ошибка")
 
-        with (
-            patch("src.bot.handlers.invite.DatabaseSession") as mock_session_cls,
-            patch(
-                "src.bot.handlers.invite.create_referral_service"
-            ) as mock_service_cls,
-            patch("src.bot.handlers.invite.UserRepository") as mock_repo_cls,
-        ):
-            mock_session = AsyncMock()
-            mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-            mock_service = MagicMock()
-            mock_service.is_enabled = MagicMock(return_value=True)
-            mock_service.get_referral_stats = AsyncMock(return_value=stats_max_reached)
-            mock_service.get_invite_link = MagicMock(
-                return_value="https://t.me/bot?start=ref_1"
-            )
-            mock_service_cls.return_value = mock_service
-
-            mock_repo = MagicMock()
-            mock_repo.get_by_telegram_id = AsyncMock(return_value=mock_db_user)
-            mock_repo_cls.return_value = mock_repo
-
-            # Act
-            await cmd_invite(mock_message, mock_l10n, mock_bot)
-
-            # Assert
-            response = mock_message.answer.call_args[0][0]
-            assert "Достигнут максимальный лимит заработка" in response
-
-    @pytest.mark.asyncio
-    async def test_cmd_invite_no_warning_when_can_earn_more(
-        self,
-        mock_message: MagicMock,
-        mock_l10n: MagicMock,
-        mock_bot: MagicMock,
-        mock_db_user: MagicMock,
-        mock_referral_stats: ReferralStats,
-    ) -> None:
-        """Проверить отсутствие предупреждения когда можно ещё зарабатывать."""
-        # Arrange
-        with (
-            patch("src.bot.handlers.invite.DatabaseSession") as mock_session_cls,
-            patch(
-                "src.bot.handlers.invite.create_referral_service"
-            ) as mock_service_cls,
-            patch("src.bot.handlers.invite.UserRepository") as mock_repo_cls,
-        ):
-            mock_session = AsyncMock()
-            mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-            mock_service = MagicMock()
-            mock_service.is_enabled = MagicMock(return_value=True)
-            mock_service.get_referral_stats = AsyncMock(
-                return_value=mock_referral_stats
-            )
-            mock_service.get_invite_link = MagicMock(
-                return_value="https://t.me/bot?start=ref_1"
-            )
-            mock_service_cls.return_value = mock_service
-
-            mock_repo = MagicMock()
-            mock_repo.get_by_telegram_id = AsyncMock(return_value=mock_db_user)
-            mock_repo_cls.return_value = mock_repo
-
-            # Act
-            await cmd_invite(mock_message, mock_l10n, mock_bot)
-
-            # Assert
-            response = mock_message.answer.call_args[0][0]
-            assert "Достигнут максимальный лимит заработка" not in response
-
-    @pytest.mark.asyncio
-    async def test_cmd_invite_no_pending_bonuses_info_when_zero(
-        self,
-        mock_message: MagicMock,
-        mock_l10n: MagicMock,
-        mock_bot: MagicMock,
-        mock_db_user: MagicMock,
-        mock_referral_stats: ReferralStats,
-    ) -> None:
-        """Проверить отсутствие информации о pending bonuses когда их нет."""
-        # Arrange
-        with (
-            patch("src.bot.handlers.invite.DatabaseSession") as mock_session_cls,
-            patch(
-                "src.bot.handlers.invite.create_referral_service"
-            ) as mock_service_cls,
-            patch("src.bot.handlers.invite.UserRepository") as mock_repo_cls,
-        ):
-            mock_session = AsyncMock()
-            mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-            mock_service = MagicMock()
-            mock_service.is_enabled = MagicMock(return_value=True)
-            mock_service.get_referral_stats = AsyncMock(
-                return_value=mock_referral_stats
-            )
-            mock_service.get_invite_link = MagicMock(
-                return_value="https://t.me/bot?start=ref_1"
-            )
-            mock_service_cls.return_value = mock_service
-
-            mock_repo = MagicMock()
-            mock_repo.get_by_telegram_id = AsyncMock(return_value=mock_db_user)
-            mock_repo_cls.return_value = mock_repo
-
-            # Act
-            await cmd_invite(mock_message, mock_l10n, mock_bot)
-
-            # Assert
-            response = mock_message.answer.call_args[0][0]
-            assert "Невыплаченных бонусов" not in response
-
-    @pytest.mark.asyncio
-    async def test_cmd_invite_handles_sqlalchemy_error(
-        self,
-        mock_message: MagicMock,
-        mock_l10n: MagicMock,
-        mock_bot: MagicMock,
-    ) -> None:
-        """Проверить обработку ошибки БД (SQLAlchemyError)."""
-        # Arrange
-        with (
-            patch("src.bot.handlers.invite.DatabaseSession") as mock_session_cls,
-            patch(
-                "src.bot.handlers.invite.create_referral_service"
-            ) as mock_service_cls,
-            patch("src.bot.handlers.invite.logger") as mock_logger,
-        ):
-            mock_session = AsyncMock()
-            mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-            mock_service = MagicMock()
-            mock_service.is_enabled = MagicMock(return_value=True)
-            mock_service_cls.return_value = mock_service
-
-            # Вызываем SQLAlchemyError при обращении к UserRepository
-            with patch(
-                "src.bot.handlers.invite.UserRepository",
-                side_effect=SQLAlchemyError("DB Error"),
-            ):
-                # Act
-                await cmd_invite(mock_message, mock_l10n, mock_bot)
-
-                # Assert
-                mock_logger.exception.assert_called_once()
-                mock_message.answer.assert_called_once_with(
-                    "Произошла неизвестная ошибка"
-                )
-
-    @pytest.mark.asyncio
-    async def test_cmd_invite_handles_os_error(
-        self,
-        mock_message: MagicMock,
-        mock_l10n: MagicMock,
-        mock_bot: MagicMock,
-    ) -> None:
-        """Проверить обработку ошибки подключения к БД (OSError)."""
-        # Arrange
-        with (
-            patch("src.bot.handlers.invite.DatabaseSession") as mock_session_cls,
-            patch(
-                "src.bot.handlers.invite.create_referral_service"
-            ) as mock_service_cls,
-            patch("src.bot.handlers.invite.logger") as mock_logger,
-        ):
-            mock_session = AsyncMock()
-            mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-            mock_service = MagicMock()
-            mock_service.is_enabled = MagicMock(return_value=True)
-            mock_service_cls.return_value = mock_service
-
-            # Вызываем OSError при обращении к UserRepository
-            with patch(
-                "src.bot.handlers.invite.UserRepository",
-                side_effect=OSError("Connection Error"),
-            ):
-                # Act
-                await cmd_invite(mock_message, mock_l10n, mock_bot)
-
-                # Assert
-                mock_logger.exception.assert_called_once()
-                mock_message.answer.assert_called_once_with(
-                    "Произошла неизвестная ошибка"
-                )
-
-    @pytest.mark.asyncio
     async def test_cmd_invite_logs_debug_info(
         self,
         mock_message: MagicMock,
         mock_l10n: MagicMock,
         mock_bot: MagicMock,
-        mock_db_user: MagicMock,
-        mock_referral_stats: ReferralStats,
+        invite_patches: _InvitePatches,
     ) -> None:
         """Проверить логирование debug-информации."""
-        # Arrange
-        with (
-            patch("src.bot.handlers.invite.DatabaseSession") as mock_session_cls,
-            patch(
-                "src.bot.handlers.invite.create_referral_service"
-            ) as mock_service_cls,
-            patch("src.bot.handlers.invite.UserRepository") as mock_repo_cls,
-            patch("src.bot.handlers.invite.logger") as mock_logger,
-        ):
-            mock_session = AsyncMock()
-            mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-            mock_service = MagicMock()
-            mock_service.is_enabled = MagicMock(return_value=True)
-            mock_service.get_referral_stats = AsyncMock(
-                return_value=mock_referral_stats
-            )
-            mock_service.get_invite_link = MagicMock(
-                return_value="https://t.me/bot?start=ref_1"
-            )
-            mock_service_cls.return_value = mock_service
-
-            mock_repo = MagicMock()
-            mock_repo.get_by_telegram_id = AsyncMock(return_value=mock_db_user)
-            mock_repo_cls.return_value = mock_repo
-
-            # Act
-            await cmd_invite(mock_message, mock_l10n, mock_bot)
-
-            # Assert
-            mock_logger.debug.assert_called_once()
-            log_message = mock_logger.debug.call_args[0][0]
-            assert "Показана реферальная информация" in log_message
-
-    @pytest.mark.asyncio
+        # Act
+        await cmd_invite(mock_message, mock_l10n, mock_bot)
+
+        # Assert
+        invite_patches.logger.debug.assert_called_once()
+        log_message = invite_patches.logger.debug.call_args[0][0]
+        assert "Показана реферальная информация" in log_message
+
     async def test_cmd_invite_gets_bot_username(
         self,
         mock_message: MagicMock,
         mock_l10n: MagicMock,
         mock_bot: MagicMock,
-        mock_db_user: MagicMock,
-        mock_referral_stats: ReferralStats,
+        mock_db_user: Any,
+        invite_patches: _InvitePatches,
     ) -> None:
         """Проверить получение username бота для ссылки."""
-        # Arrange
-        with (
-            patch("src.bot.handlers.invite.DatabaseSession") as mock_session_cls,
-            patch(
-                "src.bot.handlers.invite.create_referral_service"
-            ) as mock_service_cls,
-            patch("src.bot.handlers.invite.UserRepository") as mock_repo_cls,
-        ):
-            mock_session = AsyncMock()
-            mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-            mock_service = MagicMock()
-            mock_service.is_enabled = MagicMock(return_value=True)
-            mock_service.get_referral_stats = AsyncMock(
-                return_value=mock_referral_stats
-            )
-            mock_service.get_invite_link = MagicMock(
-                return_value="https://t.me/bot?start=ref_1"
-            )
-            mock_service_cls.return_value = mock_service
-
-            mock_repo = MagicMock()
-            mock_repo.get_by_telegram_id = AsyncMock(return_value=mock_db_user)
-            mock_repo_cls.return_value = mock_repo
-
-            # Act
-            await cmd_invite(mock_message, mock_l10n, mock_bot)
-
-            # Assert
-            mock_bot.get_me.assert_called_once()
-            mock_service.get_invite_link.assert_called_once_with(
-                mock_db_user, "test_bot"
-            )
-
-    @pytest.mark.asyncio
+        # Act
+        await cmd_invite(mock_message, mock_l10n, mock_bot)
+
+        # Assert
+        mock_bot.get_me.assert_called_once()
+        invite_patches.service.get_invite_link.assert_called_once_with(
+            mock_db_user, "test_bot"
+        )
+
     async def test_cmd_invite_handles_bot_without_username(
         self,
         mock_message: MagicMock,
         mock_l10n: MagicMock,
-        mock_db_user: MagicMock,
-        mock_referral_stats: ReferralStats,
+        mock_bot: MagicMock,
+        mock_db_user: Any,
+        invite_patches: _InvitePatches,
     ) -> None:
         """Проверить обработку бота без username (использует fallback 'bot')."""
         # Arrange
-        bot_without_username = MagicMock(spec=Bot)
-        bot_me = MagicMock()
-        bot_me.username = None  # Username отсутствует
-        bot_without_username.get_me = AsyncMock(return_value=bot_me)
-
-        with (
-            patch("src.bot.handlers.invite.DatabaseSession") as mock_session_cls,
-            patch(
-                "src.bot.handlers.invite.create_referral_service"
-            ) as mock_service_cls,
-            patch("src.bot.handlers.invite.UserRepository") as mock_repo_cls,
-        ):
-            mock_session = AsyncMock()
-            mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-            mock_service = MagicMock()
-            mock_service.is_enabled = MagicMock(return_value=True)
-            mock_service.get_referral_stats = AsyncMock(
-                return_value=mock_referral_stats
-            )
-            mock_service.get_invite_link = MagicMock(
-                return_value="https://t.me/bot?start=ref_1"
-            )
-            mock_service_cls.return_value = mock_service
-
-            mock_repo = MagicMock()
-            mock_repo.get_by_telegram_id = AsyncMock(return_value=mock_db_user)
-            mock_repo_cls.return_value = mock_repo
-
-            # Act
-            await cmd_invite(mock_message, mock_l10n, bot_without_username)
-
-            # Assert
-            mock_service.get_invite_link.assert_called_once_with(mock_db_user, "bot")
+        mock_bot.get_me.return_value.username = None  # Username отсутствует
+
+        # Act
+        await cmd_invite(mock_message, mock_l10n, mock_bot)
+
+        # Assert
+        invite_patches.service.get_invite_link.assert_called_once_with(
+            mock_db_user, "bot"
+        )
@@ -18,79 +18,61 @@
 10. Проверка что callback отвечает (убирает "часики")
 """
 
+import logging
+from collections.abc import Iterator
+from dataclasses import dataclass
 from typing import Any
-from unittest.mock import AsyncMock, MagicMock, call, patch
+from unittest.mock import AsyncMock, MagicMock, call
 
 import pytest
-from aiogram.types import (
-    CallbackQuery,
-    InlineKeyboardMarkup,
-    Message,
-    User,
-)
+from aiogram.types import InlineKeyboardMarkup
+from sqlalchemy.exc import SQLAlchemyError
 
 from src.bot.handlers.language import (
     cmd_language,
     process_language_selection,
 )
 from src.bot.keyboards import create_language_keyboard
-from src.db.models.user import User as DbUser
-from src.utils.i18n import Localization
+
+# Все тесты модуля выполняются в одном воркере xdist (--dist loadgroup).
+pytestmark = [
+    pytest.mark.xdist_group(name="language_handlers"),
+    # Доступные языки ru и en (см. conftest.py)
+    pytest.mark.usefixtures("ru_en_languages"),
+]
 
 # ==============================================================================
 # ФИКСТУРЫ
 # ==============================================================================
 
+# Заглушки Message, CallbackQuery и DB User — в tests/bot/handlers/conftest.py.
+
+_TRANSLATIONS_RU = {
+    "language_command": "Выберите язык интерфейса:",
+    "language_name_ru": "🇷🇺 Русский",
+    "language_name_en": "🇬🇧 English",
+    "language_changed": "✅ Язык интерфейса изменён на {language_name}",
+    "error_language_not_supported": "❌ Этот язык пока не поддерживается.",
+    "error_unknown": "❌ Произошла ошибка. Попробуйте ещё раз.",
+    "error_callback_data": "❌ Ошибка: данные не найдены",
+}
+
+_TRANSLATIONS_EN = {
+    "language_command": "Choose your interface language:",
+    "language_name_ru": "🇷🇺 Russian",
+    "language_name_en": "🇬🇧 English",
+    "language_changed": "✅ Interface language changed to {language_name}",
+    "error_language_not_supported": "❌ This language is not supported yet.",
+    "error_unknown": "❌ An error occurred. Please try again.",
+}
+
+
+def _make_l10n(language: str, translations: dict[str, str]) -> MagicMock:
+    """Создать мок Localization, возвращающий переводы из словаря."""
+    l10n = MagicMock()
+    l10n.language = language
 
-@pytest.fixture
-def mock_message() -> MagicMock:
-    """Мок Message с пользователем."""
-    message = MagicMock(spec=Message)
-    message.from_user = User(
-        id=123456789,
-        is_bot=False,
-        first_name="Test User",
-    )
-    message.answer = AsyncMock()
-    return message
-
-
-@pytest.fixture
-def mock_callback_query() -> MagicMock:
-    """Мок CallbackQuery с пользователем."""
-    callback = MagicMock(spec=CallbackQuery)
-    callback.from_user = User(
-        id=123456789,
-        is_bot=False,
-        first_name="Test User",
-    )
-    callback.data = "lang:en"
-    callback.answer = AsyncMock()
-
-    # Мок для callback.message
-    callback.message = MagicMock(spec=Message)
-    callback.message.edit_text = AsyncMock()
-
-    return callback
-
-
-@pytest.fixture
-def mock_l10n_ru() -> MagicMock:
-    """Мок Localization для русского языка."""
-    l10n = MagicMock(spec=Localization)
-    l10n.language = "ru"
-
-    # Настраиваем get() для возврата переводов
     def get_translation(key: str, **kwargs: Any) -> str:
-        translations = {
-            "language_command": "Выберите язык интерфейса:",
-            "language_name_ru": "🇷🇺 Русский",
-            "language_name_en": "🇬🇧 English",
-            "language_changed": "✅ Язык интерфейса изменён на {language_name}",
-            "error_language_not_supported": "❌ Этот язык пока не поддерживается.",
-            "error_unknown": "❌ Произошла ошибка. Попробуйте ещё раз.",
-            "error_callback_data": "❌ Ошибка: данные не найдены",
-        }
         text = translations.get(key, key)
         if kwargs:
             return text.format(**kwargs)
@@ -100,38 +82,80 @@ def mock_l10n_ru() -> MagicMock:
     return l10n
 
 
+@pytest.fixture(scope="module")
+def module_l10n_ru() -> MagicMock:
+    """Мок Localization для русского языка, один на модуль.
+
+    Напрямую в тестах не используется — см. фикстуру mock_l10n_ru.
+    """
+    return _make_l10n("ru", _TRANSLATIONS_RU)
+
+
+@pytest.fixture(scope="module")
+def module_l10n_en() -> MagicMock:
+    """Мок Localization для английского языка, один на модуль.
+
+    Напрямую в тестах не используется — см. фикстуру mock_l10n_en.
+    """
+    return _make_l10n("en", _TRANSLATIONS_EN)
+
+
 @pytest.fixture
-def mock_l10n_en() -> MagicMock:
-    """Мок Localization для английского языка."""
-    l10n = MagicMock(spec=Localization)
-    l10n.language = "en"
+def mock_l10n_ru(module_l10n_ru: MagicMock) -> Iterator[MagicMock]:
+    """Мок Localization для русского языка со сбросом истории вызовов."""
+    yield module_l10n_ru
+    module_l10n_ru.reset_mock()
 
-    def get_translation(key: str, **kwargs: Any) -> str:
-        translations = {
-            "language_command": "Choose your interface language:",
-            "language_name_ru": "🇷🇺 Russian",
-            "language_name_en": "🇬🇧 English",
-            "language_changed": "✅ Interface language changed to {language_name}",
-            "error_language_not_supported": "❌ This language is not supported yet.",
-            "error_unknown": "❌ An error occurred. Please try again.",
-        }
-        text = translations.get(key, key)
-        if kwargs:
-            return text.format(**kwargs)
-        return text
 
-    l10n.get.side_effect = get_translation
-    return l10n
+@pytest.fixture
+def mock_l10n_en(module_l10n_en: MagicMock) -> Iterator[MagicMock]:
+    """Мок Localization для английского языка со сбросом истории вызовов."""
+    yield module_l10n_en
+    module_l10n_en.reset_mock()
+
+
+@dataclass
+class _SelectionPatches:
+    """Моки зависимостей process_language_selection."""
+
+    session_cls: MagicMock
+    repo: MagicMock
+    create_l10n: MagicMock
 
 
 @pytest.fixture
-def mock_db_user() -> MagicMock:
-    """Мок пользователя из БД."""
-    user = MagicMock(spec=DbUser)
-    user.id = 1
-    user.telegram_id = 123456789
-    user.language = "ru"
-    return user
+def selection_patches(
+    monkeypatch: pytest.MonkeyPatch,
+    mock_db_user: Any,
+    mock_l10n_en: MagicMock,
+    db_session_cm: Any,
+) -> _SelectionPatches:
+    """Подменить зависимости process_language_selection.
+
+    По умолчанию пользователь найден (mock_db_user), а create_localization
+    возвращает mock_l10n_en. Тест меняет только то, что проверяет,
+    например selection_patches.repo.get_by_telegram_id.
+    """
+
+    repo = MagicMock()
+    repo.get_by_telegram_id = AsyncMock(return_value=mock_db_user)
+    repo.update_language = AsyncMock(return_value=mock_db_user)
+
+    patches = _SelectionPatches(
+        session_cls=MagicMock(return_value=db_session_cm),
+        repo=repo,
+        create_l10n=MagicMock(return_value=mock_l10n_en),
+    )
+    monkeypatch.setattr(
+        "src.bot.handlers.language.DatabaseSession", patches.session_cls
+    )
+    monkeypatch.setattr(
+        "src.bot.handlers.language.UserRepository", MagicMock(return_value=repo)
+    )
+    monkeypatch.setattr(
+        "src.bot.handlers.language.create_localization", patches.create_l10n
+    )
+    return patches
 
 
 # ==============================================================================
@@ -139,13 +163,11 @@ def mock_db_user() -> MagicMock:
 # ==============================================================================
 
 
-def test_create_language_keyboard_returns_markup(mock_l10n_ru: MagicMock) -> None:
+def test_create_language_keyboard_returns_markup(
+    mock_l10n_ru: MagicMock,
+) -> None:
     """Тест: create_language_keyboard возвращает InlineKeyboardMarkup."""
-    with patch(
-        "src.bot.keyboards.inline.language.Localization.get_available_languages",
-        return_value=["ru", "en"],
-    ):
-        keyboard = create_language_keyboard(mock_l10n_ru)
+    keyboard = create_language_keyboard(mock_l10n_ru)
 
     assert isinstance(keyboard, InlineKeyboardMarkup)
 
@@ -154,11 +176,7 @@ def testcreate_language_keyboard_contains_all_available_languages(
     mock_l10n_ru: MagicMock,
 ) -> None:
     """Тест: клавиатура содержит кнопки для всех доступных языков."""
-    with patch(
-        "src.bot.keyboards.inline.language.Localization.get_available_languages",
-        return_value=["ru", "en"],
-    ):
-        keyboard = create_language_keyboard(mock_l10n_ru)
+    keyboard = create_language_keyboard(mock_l10n_ru)
 
     # Проверяем количество кнопок
     assert len(keyboard.inline_keyboard) == 2
@@ -175,11 +193,7 @@ def testcreate_language_keyboard_buttons_have_correct_text(
     mock_l10n_ru: MagicMock,
 ) -> None:
     """Тест: кнопки имеют правильный текст (названия языков)."""
-    with patch(
-        "src.bot.keyboards.inline.language.Localization.get_available_languages",
-        return_value=["ru", "en"],
-    ):
-        keyboard = create_language_keyboard(mock_l10n_ru)
+    keyboard = create_language_keyboard(mock_l10n_ru)
 
     # Проверяем что клавиатура создана
     assert keyboard.inline_keyboard
@@ -194,13 +208,14 @@ def testcreate_language_keyboard_buttons_have_correct_text(
 
 def testcreate_language_keyboard_each_button_on_separate_row(
     mock_l10n_ru: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
 ) -> None:
     """Тест: каждая кнопка на отдельной строке."""
-    with patch(
+    monkeypatch.setattr(
         "src.bot.keyboards.inline.language.Localization.get_available_languages",
-        return_value=["ru", "en", "zh"],
-    ):
-        keyboard = create_language_keyboard(mock_l10n_ru)
+        staticmethod(lambda: ["ru", "en", "zh"]),
+    )
+    keyboard = create_language_keyboard(mock_l10n_ru)
 
     # Должно быть 3 строки (по одной кнопке в каждой)
     assert len(keyboard.inline_keyboard) == 3
@@ -216,11 +231,7 @@ def test_create_language_keyboard_with_custom_prefix(
     """Тест: клавиатура использует кастомный префикс callback_data."""
     custom_prefix = "settings_lang:"
 
-    with patch(
-        "src.bot.keyboards.inline.language.Localization.get_available_languages",
-        return_value=["ru", "en"],
-    ):
-        keyboard = create_language_keyboard(mock_l10n_ru, callback_prefix=custom_prefix)
+    keyboard = create_language_keyboard(mock_l10n_ru, callback_prefix=custom_prefix)
 
     # Получаем все кнопки из клавиатуры
     buttons = [btn for row in keyboard.inline_keyboard for btn in row]
@@ -240,20 +251,17 @@ def test_create_language_keyboard_with_custom_prefix(
 # ==============================================================================
 
 
-@pytest.mark.asyncio
 async def test_cmd_language_sends_message_with_keyboard(
     mock_message: MagicMock,
     mock_l10n_ru: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
 ) -> None:
     """Тест: /language отправляет сообщение с клавиатурой."""
-    with (
-        patch("src.bot.handlers.language.Localization.is_enabled", return_value=True),
-        patch(
-            "src.bot.keyboards.inline.language.Localization.get_available_languages",
-            return_value=["ru", "en"],
-        ),
-    ):
-        await cmd_language(mock_message, mock_l10n_ru)
+    monkeypatch.setattr(
+        "src.bot.handlers.language.Localization.is_enabled",
+        staticmethod(lambda: True),
+    )
+    await cmd_language(mock_message, mock_l10n_ru)
 
     # Проверяем что answer был вызван
     mock_message.answer.assert_called_once()
@@ -270,14 +278,17 @@ async def test_cmd_language_sends_message_with_keyboard(
     assert isinstance(reply_markup, InlineKeyboardMarkup)
 
 
-@pytest.mark.asyncio
 async def test_cmd_language_ignores_command_if_disabled(
     mock_message: MagicMock,
     mock_l10n_ru: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
 ) -> None:
     """Тест: /language игнорируется если мультиязычность отключена."""
-    with patch("src.bot.handlers.language.Localization.is_enabled", return_value=False):
-        await cmd_language(mock_message, mock_l10n_ru)
+    monkeypatch.setattr(
+        "src.bot.handlers.language.Localization.is_enabled",
+        staticmethod(lambda: False),
+    )
+    await cmd_language(mock_message, mock_l10n_ru)
 
     # answer НЕ должен быть вызван — команда проигнорирована
     mock_message.answer.assert_not_called()
@@ -288,130 +299,44 @@ async def test_cmd_language_ignores_command_if_disabled(
 # ==============================================================================
 
 
-@pytest.mark.asyncio
-async def test_process_language_selection_updates_user_language(
+async def test_process_language_selection_updates_language_and_confirms(
     mock_callback_query: MagicMock,
     mock_l10n_ru: MagicMock,
-    mock_l10n_en: MagicMock,
-    mock_db_user: MagicMock,
+    mock_db_user: Any,
+    selection_patches: _SelectionPatches,
 ) -> None:
-    """Тест: выбор языка обновляет User.language в БД."""
-    mock_callback_query.data = "lang:en"
+    """Тест: выбор языка обновляет БД, подтверждает на НОВОМ языке и отвечает.
 
-    with (
-        patch(
-            "src.bot.handlers.language.Localization.get_available_languages",
-            return_value=["ru", "en"],
-        ),
-        patch("src.bot.handlers.language.DatabaseSession") as mock_session_cls,
-        patch("src.bot.handlers.language.UserRepository") as mock_repo_cls,
-        patch(
-            "src.bot.handlers.language.create_localization", return_value=mock_l10n_en
-        ),
-    ):
-        # Настраиваем DatabaseSession
-        mock_session = AsyncMock()
-        mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-        # Настраиваем UserRepository
-        mock_repo = MagicMock()
-        mock_repo.get_by_telegram_id = AsyncMock(return_value=mock_db_user)
-        mock_repo.update_language = AsyncMock(return_value=mock_db_user)
-        mock_repo_cls.return_value = mock_repo
-
-        await process_language_selection(mock_callback_query, mock_l10n_ru)
-
-    # Проверяем что update_language был вызван
-    mock_repo.update_language.assert_called_once_with(mock_db_user, "en")
-
-
-@pytest.mark.asyncio
-async def test_process_language_selection_sends_confirmation_in_new_language(
-    mock_callback_query: MagicMock,
-    mock_l10n_ru: MagicMock,
-    mock_l10n_en: MagicMock,
-    mock_db_user: MagicMock,
-) -> None:
-    """Тест: подтверждение отправляется на НОВОМ языке."""
+    Все проверки относятся к одному успешному вызову обработчика,
+    поэтому он выполняется один раз.
+    """
     mock_callback_query.data = "lang:en"
 
-    with (
-        patch(
-            "src.bot.handlers.language.Localization.get_available_languages",
-            return_value=["ru", "en"],
-        ),
-        patch("src.bot.handlers.language.DatabaseSession") as mock_session_cls,
-        patch("src.bot.handlers.language.UserRepository") as mock_repo_cls,
-        patch(
-            "src.bot.handlers.language.create_localization", return_value=mock_l10n_en
-        ) as mock_create_l10n,
-    ):
-        mock_session = AsyncMock()
-        mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-        mock_repo = MagicMock()
-        mock_repo.get_by_telegram_id = AsyncMock(return_value=mock_db_user)
-        mock_repo.update_language = AsyncMock(return_value=mock_db_user)
-        mock_repo_cls.return_value = mock_repo
-
-        await process_language_selection(mock_callback_query, mock_l10n_ru)
-
-    # Проверяем что был создан НОВЫЙ объект Localization с выбранным языком
-    mock_create_l10n.assert_called_with("en")
-
-    # Проверяем что edit_text был вызван с переводом на новом языке
-    mock_callback_query.message.edit_text.assert_called_once()
-
+    await process_language_selection(mock_callback_query, mock_l10n_ru)
 
-@pytest.mark.asyncio
-async def test_process_language_selection_answers_callback(
-    mock_callback_query: MagicMock,
-    mock_l10n_ru: MagicMock,
-    mock_l10n_en: MagicMock,
-    mock_db_user: MagicMock,
-) -> None:
-    """Тест: callback отвечает (убирает 'часики')."""
-    mock_callback_query.data = "lang:en"
+    # User.language обновлён в БД
+    selection_patches.repo.update_language.assert_called_once_with(mock_db_user, "en")
 
-    with (
-        patch(
-            "src.bot.handlers.language.Localization.get_available_languages",
-            return_value=["ru", "en"],
-        ),
-        patch("src.bot.handlers.language.DatabaseSession") as mock_session_cls,
-        patch("src.bot.handlers.language.UserRepository") as mock_repo_cls,
-        patch(
-            "src.bot.handlers.language.create_localization", return_value=mock_l10n_en
-        ),
-    ):
-        mock_session = AsyncMock()
-        mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-        mock_repo = MagicMock()
-        mock_repo.get_by_telegram_id = AsyncMock(return_value=mock_db_user)
-        mock_repo.update_language = AsyncMock(return_value=mock_db_user)
-        mock_repo_cls.return_value = mock_repo
-
-        await process_language_selection(mock_callback_query, mock_l10n_ru)
+    # Создан НОВЫЙ объект Localization с выбранным языком,
+    # и подтверждение отправлено на новом языке
+    selection_patches.create_l10n.assert_called_with("en")
+    mock_callback_query.message.edit_text.assert_called_once()
 
-    # Проверяем что answer был вызван
+    # Callback отвечает (убирает "часики")
     mock_callback_query.answer.assert_called_once()
 
 
-@pytest.mark.asyncio
+@pytest.mark.usefixtures("selection_patches")
 async def test_process_language_selection_rejects_unavailable_language(
     mock_callback_query: MagicMock,
     mock_l10n_ru: MagicMock,
     caplog: pytest.LogCaptureFixture,
 ) -> None:
     """Тест: выбор недоступного языка отклоняется."""
+    caplog.set_level(logging.WARNING, logger="src.bot.handlers.language")
     mock_callback_query.data = "lang:fr"  # Недоступный язык
 
-    with patch(
-        "src.bot.handlers.language.Localization.get_available_languages",
-        return_value=["ru", "en"],
-    ):
-        await process_language_selection(mock_callback_query, mock_l10n_ru)
+    await process_language_selection(mock_callback_query, mock_l10n_ru)
 
     # Проверяем что был отправлен ответ с ошибкой
     mock_callback_query.answer.assert_called_once_with(
@@ -420,37 +345,24 @@ async def test_process_language_selection_rejects_unavailable_language(
 
     # Проверяем предупреждение в логах
     assert any(
-        "Попытка выбрать недоступный язык" in record.message
-        for record in caplog.records
+        message.startswith("Попытка выбрать недоступный язык")
+        for _, _, message in caplog.record_tuples
     )
 
 
-@pytest.mark.asyncio
 async def test_process_language_selection_handles_missing_user(
     mock_callback_query: MagicMock,
     mock_l10n_ru: MagicMock,
+    selection_patches: _SelectionPatches,
     caplog: pytest.LogCaptureFixture,
 ) -> None:
     """Тест: обработка отсутствия пользователя в БД."""
+    caplog.set_level(logging.WARNING, logger="src.bot.handlers.language")
     mock_callback_query.data = "lang:en"
+    # Пользователь не найден
+    selection_patches.repo.get_by_telegram_id.return_value = None
 
-    with (
-        patch(
-            "src.bot.handlers.language.Localization.get_available_languages",
-            return_value=["ru", "en"],
-        ),
-        patch("src.bot.handlers.language.DatabaseSession") as mock_session_cls,
-        patch("src.bot.handlers.language.UserRepository") as mock_repo_cls,
-    ):
-        mock_session = AsyncMock()
-        mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-        # Пользователь не найден
-        mock_repo = MagicMock()
-        mock_repo.get_by_telegram_id = AsyncMock(return_value=None)
-        mock_repo_cls.return_value = mock_repo
-
-        await process_language_selection(mock_callback_query, mock_l10n_ru)
+    await process_language_selection(mock_callback_query, mock_l10n_ru)
 
     # Должен быть отправлен ответ с ошибкой
     mock_callback_query.answer.assert_called_once_with(
@@ -459,34 +371,24 @@ async def test_process_language_selection_handles_missing_user(
 
     # Должна быть ошибка в логах
     assert any(
-        "Пользователь не найден в БД" in record.message for record in caplog.records
+        message.startswith("Пользователь не найден в БД")
+        for _, _, message in caplog.record_tuples
     )
 
 
-@pytest.mark.asyncio
 async def test_process_language_selection_handles_database_error(
     mock_callback_query: MagicMock,
     mock_l10n_ru: MagicMock,
+    selection_patches: _SelectionPatches,
     caplog: pytest.LogCaptureFixture,
 ) -> None:
     """Тест: обработка ошибки при обновлении языка."""
-    from sqlalchemy.exc import SQLAlchemyError
-
+    caplog.set_level(logging.WARNING, logger="src.bot.handlers.language")
     mock_callback_query.data = "lang:en"
+    # DatabaseSession выбрасывает SQLAlchemyError
+    selection_patches.session_cls.side_effect = SQLAlchemyError("Database error")
 
-    with (
-        patch(
-            "src.bot.handlers.language.Localization.get_available_languages",
-            return_value=["ru", "en"],
-        ),
-        patch("src.bot.handlers.language.DatabaseSession") as mock_session_cls,
-    ):
-        # DatabaseSession выбрасывает SQLAlchemyError
-        mock_session_cls.return_value.__aenter__.side_effect = SQLAlchemyError(
-            "Database error"
-        )
-
-        await process_language_selection(mock_callback_query, mock_l10n_ru)
+    await process_language_selection(mock_callback_query, mock_l10n_ru)
 
     # Должен быть отправлен ответ с ошибкой
     mock_callback_query.answer.assert_called_once_with(
@@ -494,10 +396,11 @@ async def test_process_language_selection_handles_database_error(
     )
 
     # Должна быть ошибка в логах
-    assert any("Ошибка БД" in record.message for record in caplog.records)
+    assert any(
+        message.startswith("Ошибка БД") for _, _, message in caplog.record_tuples
+    )
 
 
-@pytest.mark.asyncio
 async def test_process_language_selection_handles_missing_callback_data(
     mock_callback_query: MagicMock,
     mock_l10n_ru: MagicMock,
@@ -16,20 +16,27 @@
 8. Логирование создания/обновления пользователя
 """
 
+import logging
+from collections.abc import Iterator
+from dataclasses import dataclass
+from types import SimpleNamespace
 from typing import Any
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
-from aiogram.types import Message, User
+from aiogram.types import Message, ReplyKeyboardRemove, User
 
 from src.bot.handlers.start import (
     _detect_user_language,
     _extract_start_param,
     cmd_start,
 )
-from src.db.models.user import User as DbUser
+from src.services.referral_service import ReferralResult
 from src.utils.i18n import Localization
 
+# Все тесты модуля выполняются в одном воркере xdist (--dist loadgroup).
+pytestmark = pytest.mark.xdist_group(name="start_handlers")
+
 # ==============================================================================
 # ФИКСТУРЫ
 # ==============================================================================
@@ -38,36 +45,49 @@ from src.utils.i18n import Localization
 @pytest.fixture
 def mock_message() -> MagicMock:
     """Мок Message с пользователем."""
-    message = MagicMock(spec=Message)
-    message.from_user = User(
-        id=123456789,
-        is_bot=False,
-        first_name="Test User",
-        last_name="Last Name",
-        username="testuser",
-        language_code="ru",
+    return MagicMock(
+        spec=Message,
+        from_user=User(
+            id=123456789,
+            is_bot=False,
+            first_name="Test User",
+            last_name="Last Name",
+            username="testuser",
+            language_code="ru",
+        ),
+        text="/start",
+        answer=AsyncMock(),
+        answer_photo=AsyncMock(),
     )
-    message.text = "/start"
-    message.answer = AsyncMock()
-    message.answer_photo = AsyncMock()
-    return message
 
 
-@pytest.fixture
-def mock_l10n_ru() -> MagicMock:
-    """Мок Localization для русского языка."""
+_TRANSLATIONS_RU = {
+    "start_message": (
+        "Привет! Я бот для AI-генерации.\n\n"
+        "Доступные команды:\n"
+        "/start — начать работу\n"
+        "/language — выбрать язык интерфейса"
+    ),
+    "billing_registration_bonus": "Вам начислено {amount} токенов!",
+    "referral_invitee_bonus": "Бонус за приглашение: {amount} токенов!",
+}
+
+_TRANSLATIONS_EN = {
+    "start_message": (
+        "Hello! I'm an AI generation bot.\n\n"
+        "Available commands:\n"
+        "/start — start using the bot\n"
+        "/language — choose interface language"
+    ),
+}
+
+
+def _make_l10n(language: str, translations: dict[str, str]) -> MagicMock:
+    """Создать мок Localization, возвращающий переводы из словаря."""
     l10n = MagicMock(spec=Localization)
-    l10n.language = "ru"
+    l10n.language = language
 
     def get_translation(key: str, **kwargs: Any) -> str:
-        translations = {
-            "start_message": (
-                "Привет! Я бот для AI-генерации.\n\n"
-                "Доступные команды:\n"
-                "/start — начать работу\n"
-                "/language — выбрать язык интерфейса"
-            ),
-        }
         text = translations.get(key, key)
         if kwargs:
             return text.format(**kwargs)
@@ -77,28 +97,125 @@ def mock_l10n_ru() -> MagicMock:
     return l10n
 
 
+@pytest.fixture(scope="module")
+def module_l10n_ru() -> MagicMock:
+    """Мок Localization для русского языка, один на модуль.
+
+    Напрямую в тестах не используется — см. фикстуру mock_l10n_ru.
+    """
+    return _make_l10n("ru", _TRANSLATIONS_RU)
+
+
+@pytest.fixture(scope="module")
+def module_l10n_en() -> MagicMock:
+    """Мок Localization для английского языка, один на модуль.
+
+    Напрямую в тестах не используется — см. фикстуру mock_l10n_en.
+    """
+    return _make_l10n("en", _TRANSLATIONS_EN)
+
+
 @pytest.fixture
-def mock_l10n_en() -> MagicMock:
-    """Мок Localization для английского языка."""
-    l10n = MagicMock(spec=Localization)
-    l10n.language = "en"
+def mock_l10n_ru(module_l10n_ru: MagicMock) -> Iterator[MagicMock]:
+    """Мок Localization для русского языка (см. module_l10n_ru).
 
-    def get_translation(key: str, **kwargs: Any) -> str:
-        translations = {
-            "start_message": (
-                "Hello! I'm an AI generation bot.\n\n"
-                "Available commands:\n"
-                "/start — start using the bot\n"
-                "/language — choose interface language"
-            ),
-        }
-        text = translations.get(key, key)
-        if kwargs:
-            return text.format(**kwargs)
-        return text
+    После теста очищается история вызовов; side_effect тесты не меняют.
+    """
+    yield module_l10n_ru
+    module_l10n_ru.reset_mock()
+
+
+@pytest.fixture
+def mock_l10n_en(module_l10n_en: MagicMock) -> Iterator[MagicMock]:
+    """Мок Localization для английского языка (см. module_l10n_en)."""
+    yield module_l10n_en
+    module_l10n_en.reset_mock()
 
-    l10n.get.side_effect = get_translation
-    return l10n
+
+@pytest.fixture(scope="module", autouse=True)
+def disable_legal() -> Iterator[None]:
+    """Отключить проверку согласия с документами для всего модуля.
+
+    Тесты /start проверяют приветствие, бонусы и рефералов, а не запрос
+    согласия (он покрыт в test_terms.py). yaml_config подменяется один
+    раз на модуль вместо patch() в каждом тесте.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(
+            "src.bot.handlers.start.yaml_config",
+            SimpleNamespace(legal=SimpleNamespace(enabled=False)),
+        )
+        yield
+
+
+@pytest.fixture
+def info_caplog(caplog: pytest.LogCaptureFixture) -> pytest.LogCaptureFixture:
+    """caplog, перехватывающий INFO-записи логгера обработчика /start.
+
+    Подключают только тесты, проверяющие логи: остальные не прогоняют
+    INFO-записи через обработчики pytest.
+    """
+    caplog.set_level(logging.INFO, logger="src.bot.handlers.start")
+    return caplog
+
+
+@dataclass
+class _StartPatches:
+    """Моки зависимостей cmd_start."""
+
+    repo: MagicMock
+    billing: Any
+    detect_language: MagicMock
+    referral: MagicMock
+
+
+@pytest.fixture
+def start_patches(
+    monkeypatch: pytest.MonkeyPatch,
+    db_session_cm: Any,
+    mock_user_repo: MagicMock,
+    mock_billing: Any,
+) -> _StartPatches:
+    """Подменить DatabaseSession, UserRepository, _detect_user_language и биллинг.
+
+    По умолчанию /start вызывает новый пользователь (get_or_create
+    возвращает created=True), язык определяется как "ru", биллинг
+    не начисляет бонус, а реферальный сервис отклоняет start-параметр.
+    Тест меняет только нужные значения через start_patches.repo,
+    start_patches.billing, start_patches.detect_language и
+    start_patches.referral.
+    """
+    mock_user_repo.get_or_create.return_value = (SimpleNamespace(id=1), True)
+    detect_language = MagicMock(return_value="ru")
+    referral = MagicMock(
+        process_referral=AsyncMock(
+            return_value=ReferralResult(success=False, error="invalid_param")
+        )
+    )
+
+    monkeypatch.setattr(
+        "src.bot.handlers.start.DatabaseSession",
+        MagicMock(return_value=db_session_cm),
+    )
+    monkeypatch.setattr(
+        "src.bot.handlers.start.UserRepository",
+        MagicMock(return_value=mock_user_repo),
+    )
+    monkeypatch.setattr("src.bot.handlers.start._detect_user_language", detect_language)
+    monkeypatch.setattr(
+        "src.bot.handlers.start.create_billing_service",
+        MagicMock(return_value=mock_billing),
+    )
+    monkeypatch.setattr(
+        "src.bot.handlers.start.create_referral_service",
+        MagicMock(return_value=referral),
+    )
+    return _StartPatches(
+        repo=mock_user_repo,
+        billing=mock_billing,
+        detect_language=detect_language,
+        referral=referral,
+    )
 
 
 # ==============================================================================
@@ -108,8 +225,7 @@ def mock_l10n_en() -> MagicMock:
 
 def test_extract_start_param_returns_none_for_simple_start() -> None:
     """Тест: _extract_start_param возвращает None для простого /start."""
-    message = MagicMock(spec=Message)
-    message.text = "/start"
+    message = MagicMock(spec=Message, text="/start")
 
     result = _extract_start_param(message)
 
@@ -118,8 +234,7 @@ def test_extract_start_param_returns_none_for_simple_start() -> None:
 
 def test_extract_start_param_extracts_parameter() -> None:
     """Тест: _extract_start_param извлекает параметр из deep link."""
-    message = MagicMock(spec=Message)
-    message.text = "/start ref_123"
+    message = MagicMock(spec=Message, text="/start ref_123")
 
     result = _extract_start_param(message)
 
@@ -128,8 +243,7 @@ def test_extract_start_param_extracts_parameter() -> None:
 
 def test_extract_start_param_extracts_parameter_with_spaces() -> None:
     """Тест: _extract_start_param обрабатывает параметры с пробелами."""
-    message = MagicMock(spec=Message)
-    message.text = "/start promo winter"
+    message = MagicMock(spec=Message, text="/start promo winter")
 
     result = _extract_start_param(message)
 
@@ -139,8 +253,7 @@ def test_extract_start_param_extracts_parameter_with_spaces() -> None:
 
 def test_extract_start_param_returns_none_if_text_is_none() -> None:
     """Тест: _extract_start_param возвращает None если text отсутствует."""
-    message = MagicMock(spec=Message)
-    message.text = None
+    message = MagicMock(spec=Message, text=None)
 
     result = _extract_start_param(message)
 
@@ -152,85 +265,37 @@ def test_extract_start_param_returns_none_if_text_is_none() -> None:
 # ==============================================================================
 
 
-def test_detect_user_language_returns_language_if_available() -> None:
-    """Тест: _detect_user_language возвращает язык если он доступен."""
-    with (
-        patch(
-            "src.bot.handlers.start.Localization.get_available_languages",
-            return_value=["ru", "en"],
-        ),
-        patch(
-            "src.bot.handlers.start.Localization.get_default_language",
-            return_value="ru",
-        ),
-    ):
-        result = _detect_user_language("en")
-
-        assert result == "en"
-
-
-def test_detect_user_language_returns_default_if_unavailable() -> None:
-    """Тест: _detect_user_language возвращает default если язык недоступен."""
-    with (
-        patch(
-            "src.bot.handlers.start.Localization.get_available_languages",
-            return_value=["ru", "en"],
-        ),
-        patch(
-            "src.bot.handlers.start.Localization.get_default_language",
-            return_value="ru",
-        ),
-    ):
-        result = _detect_user_language("fr")
-
-        assert result == "ru"
-
-
-def test_detect_user_language_returns_default_if_none() -> None:
-    """Тест: _detect_user_language возвращает default если language_code=None."""
-    with patch(
-        "src.bot.handlers.start.Localization.get_default_language",
-        return_value="en",
-    ):
-        result = _detect_user_language(None)
-
-        assert result == "en"
-
-
-def test_detect_user_language_handles_locale_format() -> None:
-    """Тест: _detect_user_language обрабатывает формат ru-RU."""
-    with (
-        patch(
-            "src.bot.handlers.start.Localization.get_available_languages",
-            return_value=["ru", "en"],
-        ),
-        patch(
-            "src.bot.handlers.start.Localization.get_default_language",
-            return_value="ru",
-        ),
-    ):
-        # Telegram может вернуть "ru-RU" вместо "ru"
-        result = _detect_user_language("en-US")
-
-        assert result == "en"
-
-
-def test_detect_user_language_is_case_insensitive() -> None:
-    """Тест: _detect_user_language не чувствителен к регистру."""
-    with (
-        patch(
-            "src.bot.handlers.start.Localization.get_available_languages",
-            return_value=["ru", "en"],
-        ),
-        patch(
-            "src.bot.handlers.start.Localization.get_default_language",
-            return_value="ru",
-        ),
-    ):
+@pytest.mark.usefixtures("ru_en_languages")
+@pytest.mark.parametrize(
+    ("language_code", "default_language", "expected"),
+    [
+        # Язык доступен
+        pytest.param("en", "ru", "en", id="available"),
+        # Язык недоступен → default_language
+        pytest.param("fr", "ru", "ru", id="unavailable"),
+        # language_code=None → default_language
+        pytest.param(None, "en", "en", id="none"),
+        # Telegram может вернуть "en-US" вместо "en"
+        pytest.param("en-US", "ru", "en", id="locale_format"),
         # Telegram может вернуть "EN" или "En"
-        result = _detect_user_language("EN")
+        pytest.param("EN", "ru", "en", id="case_insensitive"),
+    ],
+)
+def test_detect_user_language(
+    monkeypatch: pytest.MonkeyPatch,
+    language_code: str | None,
+    default_language: str,
+    expected: str,
+) -> None:
+    """Тест: _detect_user_language выбирает доступный язык или default.
+
+    Доступные языки ru и en задаёт фикстура ru_en_languages (conftest.py).
+    """
+    monkeypatch.setattr(
+        Localization, "get_default_language", staticmethod(lambda: default_language)
+    )
 
-        assert result == "en"
+    assert _detect_user_language(language_code) == expected
 
 
 # ==============================================================================
@@ -238,44 +303,18 @@ def test_detect_user_language_is_case_insensitive() -> None:
 # ==============================================================================
 
 
-@pytest.mark.asyncio
 async def test_cmd_start_creates_new_user(
     mock_message: MagicMock,
     mock_l10n_ru: MagicMock,
-    caplog: pytest.LogCaptureFixture,
+    start_patches: _StartPatches,
+    info_caplog: pytest.LogCaptureFixture,
 ) -> None:
-    """Тест: /start создаёт нового пользователя при первом запуске."""
-    import logging
-
-    caplog.set_level(logging.INFO)
-
-    with (
-        patch("src.bot.handlers.start.DatabaseSession") as mock_session_cls,
-        patch("src.bot.handlers.start.UserRepository") as mock_repo_cls,
-        patch("src.bot.handlers.start._detect_user_language", return_value="ru"),
-        patch("src.bot.handlers.start.create_billing_service") as mock_billing_cls,
-    ):
-        # Настраиваем DatabaseSession
-        mock_session = AsyncMock()
-        mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-        # Настраиваем UserRepository
-        mock_repo = MagicMock()
-        mock_repo.get_or_create = AsyncMock(
-            return_value=(MagicMock(spec=DbUser), True)  # created=True
-        )
-        mock_repo_cls.return_value = mock_repo
-
-        # Мокируем биллинг — бонус 0
-        mock_billing = MagicMock()
-        mock_billing.grant_registration_bonus = AsyncMock(return_value=0)
-        mock_billing_cls.return_value = mock_billing
-
-        await cmd_start(mock_message, mock_l10n_ru)
+    """Тест: /start создаёт нового пользователя и логирует определённый язык."""
+    await cmd_start(mock_message, mock_l10n_ru)
 
     # Проверяем что get_or_create был вызван
     assert mock_message.from_user is not None
-    mock_repo.get_or_create.assert_called_once_with(
+    start_patches.repo.get_or_create.assert_called_once_with(
         telegram_id=mock_message.from_user.id,
         username=mock_message.from_user.username,
         first_name=mock_message.from_user.first_name,
@@ -284,198 +323,96 @@ async def test_cmd_start_creates_new_user(
         source=None,
     )
 
-    # Проверяем логирование создания пользователя
-    assert any("Новый пользователь" in record.message for record in caplog.records)
+    # Проверяем логирование создания пользователя с определённым языком
+    messages = " ".join(record.getMessage() for record in info_caplog.records)
+    assert "Новый пользователь" in messages
+    assert "language=ru" in messages
 
 
-@pytest.mark.asyncio
 async def test_cmd_start_updates_existing_user(
     mock_message: MagicMock,
     mock_l10n_ru: MagicMock,
-    caplog: pytest.LogCaptureFixture,
+    start_patches: _StartPatches,
+    info_caplog: pytest.LogCaptureFixture,
 ) -> None:
     """Тест: /start обновляет данные существующего пользователя."""
-    import logging
-
-    caplog.set_level(logging.INFO)
-
-    with (
-        patch("src.bot.handlers.start.DatabaseSession") as mock_session_cls,
-        patch("src.bot.handlers.start.UserRepository") as mock_repo_cls,
-        patch("src.bot.handlers.start._detect_user_language", return_value="ru"),
-    ):
-        mock_session = AsyncMock()
-        mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-        # Пользователь уже существует (created=False)
-        mock_repo = MagicMock()
-        mock_repo.get_or_create = AsyncMock(
-            return_value=(MagicMock(spec=DbUser), False)  # created=False
-        )
-        # update_profile должен быть AsyncMock
-        mock_repo.update_profile = AsyncMock()
-        mock_repo_cls.return_value = mock_repo
+    # Пользователь уже существует (created=False)
+    start_patches.repo.get_or_create.return_value = (SimpleNamespace(id=1), False)
 
-        await cmd_start(mock_message, mock_l10n_ru)
+    await cmd_start(mock_message, mock_l10n_ru)
 
     # Проверяем что update_profile был вызван для существующего пользователя
-    mock_repo.update_profile.assert_called_once()
+    start_patches.repo.update_profile.assert_called_once()
 
     # Проверяем логирование
-    assert any("вернулся" in record.message for record in caplog.records)
-
-
-@pytest.mark.asyncio
-async def test_cmd_start_sends_localized_message(
-    mock_message: MagicMock,
-    mock_l10n_ru: MagicMock,
-) -> None:
-    """Тест: /start отправляет приветственное сообщение на языке пользователя."""
-    # Мокируем legal config — отключаем проверку согласия
-    mock_legal_config = MagicMock()
-    mock_legal_config.enabled = False
-
-    with (
-        patch("src.bot.handlers.start.DatabaseSession") as mock_session_cls,
-        patch("src.bot.handlers.start.UserRepository") as mock_repo_cls,
-        patch("src.bot.handlers.start._detect_user_language", return_value="ru"),
-        patch("src.bot.handlers.start.create_billing_service") as mock_billing_cls,
-        patch("src.bot.handlers.start.WELCOME_IMAGE") as mock_welcome_image,
-        patch("src.bot.handlers.start.yaml_config") as mock_yaml_config,
-    ):
-        mock_yaml_config.legal = mock_legal_config
-
-        mock_session = AsyncMock()
-        mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-        mock_repo = MagicMock()
-        mock_repo.get_or_create = AsyncMock(return_value=(MagicMock(spec=DbUser), True))
-        mock_repo_cls.return_value = mock_repo
-
-        # Мокируем биллинг — бонус 0 (не показываем дополнительное сообщение)
-        mock_billing = MagicMock()
-        mock_billing.grant_registration_bonus = AsyncMock(return_value=0)
-        mock_billing_cls.return_value = mock_billing
-
-        # Мокируем welcome image — картинка существует
-        mock_welcome_image.exists.return_value = True
-
-        await cmd_start(mock_message, mock_l10n_ru)
-
-    # Проверяем что ответ с картинкой отправлен
-    mock_message.answer_photo.assert_called_once()
-
-    # Проверяем что использовался правильный ключ локализации
-    mock_l10n_ru.get.assert_called_with("start_message")
+    messages = " ".join(record.getMessage() for record in info_caplog.records)
+    assert "вернулся" in messages
 
 
-@pytest.mark.asyncio
+@pytest.mark.usefixtures("welcome_image")
 async def test_cmd_start_extracts_and_saves_start_param(
     mock_message: MagicMock,
     mock_l10n_ru: MagicMock,
+    start_patches: _StartPatches,
 ) -> None:
     """Тест: /start извлекает и сохраняет start-параметр."""
-    from src.services.referral_service import ReferralResult
-
     mock_message.text = "/start ref_123"
 
-    with (
-        patch("src.bot.handlers.start.DatabaseSession") as mock_session_cls,
-        patch("src.bot.handlers.start.UserRepository") as mock_repo_cls,
-        patch("src.bot.handlers.start._detect_user_language", return_value="ru"),
-        patch("src.bot.handlers.start.create_billing_service") as mock_billing_cls,
-        patch("src.bot.handlers.start.create_referral_service") as mock_referral_cls,
-        patch("src.bot.handlers.start.WELCOME_IMAGE") as mock_welcome_image,
-    ):
-        mock_session = AsyncMock()
-        mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-        mock_repo = MagicMock()
-        mock_repo.get_or_create = AsyncMock(return_value=(MagicMock(spec=DbUser), True))
-        mock_repo_cls.return_value = mock_repo
-
-        # Мокируем биллинг — бонус 0
-        mock_billing = MagicMock()
-        mock_billing.grant_registration_bonus = AsyncMock(return_value=0)
-        mock_billing_cls.return_value = mock_billing
-
-        # Мокируем реферальный сервис
-        mock_referral = MagicMock()
-        mock_referral.process_referral = AsyncMock(
-            return_value=ReferralResult(success=False, error="invalid_param")
-        )
-        mock_referral_cls.return_value = mock_referral
-
-        # Мокируем welcome image — картинка существует
-        mock_welcome_image.exists.return_value = True
-
-        await cmd_start(mock_message, mock_l10n_ru)
+    await cmd_start(mock_message, mock_l10n_ru)
 
     # Проверяем что source был передан в get_or_create
-    call_kwargs = mock_repo.get_or_create.call_args[1]
+    call_kwargs = start_patches.repo.get_or_create.call_args[1]
     assert call_kwargs["source"] == "ref_123"
 
 
-@pytest.mark.asyncio
+@pytest.mark.usefixtures("welcome_image")
 async def test_cmd_start_detects_language_from_telegram(
     mock_l10n_en: MagicMock,
+    start_patches: _StartPatches,
 ) -> None:
     """Тест: /start определяет язык из Telegram language_code."""
     # Создаём Message с пользователем, у которого language_code="en"
-    message = MagicMock(spec=Message)
-    message.from_user = User(
-        id=123456789,
-        is_bot=False,
-        first_name="Test User",
-        language_code="en",  # Устанавливаем при создании
+    message = MagicMock(
+        spec=Message,
+        # Без pydantic-валидации: обработчик только читает поля пользователя
+        from_user=MagicMock(
+            spec=User,
+            id=123456789,
+            is_bot=False,
+            first_name="Test User",
+            last_name=None,
+            username=None,
+            full_name="Test User",
+            language_code="en",
+        ),
+        text="/start",
+        answer=AsyncMock(),
+        answer_photo=AsyncMock(),
     )
-    message.text = "/start"
-    message.answer = AsyncMock()
-    message.answer_photo = AsyncMock()
-
-    with (
-        patch("src.bot.handlers.start.DatabaseSession") as mock_session_cls,
-        patch("src.bot.handlers.start.UserRepository") as mock_repo_cls,
-        patch(
-            "src.bot.handlers.start._detect_user_language", return_value="en"
-        ) as mock_detect,
-        patch("src.bot.handlers.start.create_billing_service") as mock_billing_cls,
-        patch("src.bot.handlers.start.WELCOME_IMAGE") as mock_welcome_image,
-    ):
-        mock_session = AsyncMock()
-        mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-        mock_repo = MagicMock()
-        mock_repo.get_or_create = AsyncMock(return_value=(MagicMock(spec=DbUser), True))
-        mock_repo_cls.return_value = mock_repo
-
-        # Мокируем биллинг — бонус 0
-        mock_billing = MagicMock()
-        mock_billing.grant_registration_bonus = AsyncMock(return_value=0)
-        mock_billing_cls.return_value = mock_billing
-
-        # Мокируем welcome image — картинка существует
-        mock_welcome_image.exists.return_value = True
-
-        await cmd_start(message, mock_l10n_en)
+
+    start_patches.detect_language.return_value = "en"
+
+    await cmd_start(message, mock_l10n_en)
 
     # Проверяем что _detect_user_language был вызван с правильным language_code
-    mock_detect.assert_called_once_with("en")
+    start_patches.detect_language.assert_called_once_with("en")
 
     # Проверяем что язык был передан в get_or_create
-    call_kwargs = mock_repo.get_or_create.call_args[1]
+    call_kwargs = start_patches.repo.get_or_create.call_args[1]
     assert call_kwargs["language"] == "en"
 
 
-@pytest.mark.asyncio
+# Message без пользователя: тест только читает его, поэтому мок создаётся
+# один раз на модуль, а перед использованием сбрасывается answer
+_NO_USER_MSG = MagicMock(spec=Message, from_user=None, answer=AsyncMock())
+
+
 async def test_cmd_start_handles_message_without_user(
     mock_l10n_ru: MagicMock,
 ) -> None:
     """Тест: /start обрабатывает сообщение без from_user."""
-    # Message без пользователя
-    message = MagicMock(spec=Message)
-    message.from_user = None
-    message.answer = AsyncMock()
+    message = _NO_USER_MSG
+    message.answer.reset_mock()
 
     await cmd_start(message, mock_l10n_ru)
 
@@ -484,256 +421,50 @@ async def test_cmd_start_handles_message_without_user(
     mock_l10n_ru.get.assert_called_with("start_message")
 
 
-@pytest.mark.asyncio
-async def test_cmd_start_logs_language_detection(
-    mock_message: MagicMock,
-    mock_l10n_ru: MagicMock,
-    caplog: pytest.LogCaptureFixture,
-) -> None:
-    """Тест: /start логирует определённый язык для нового пользователя."""
-    import logging
-
-    caplog.set_level(logging.INFO)
-
-    with (
-        patch("src.bot.handlers.start.DatabaseSession") as mock_session_cls,
-        patch("src.bot.handlers.start.UserRepository") as mock_repo_cls,
-        patch("src.bot.handlers.start._detect_user_language", return_value="ru"),
-        patch("src.bot.handlers.start.create_billing_service") as mock_billing_cls,
-    ):
-        mock_session = AsyncMock()
-        mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-        mock_repo = MagicMock()
-        mock_repo.get_or_create = AsyncMock(
-            return_value=(MagicMock(spec=DbUser), True)  # created=True
-        )
-        mock_repo_cls.return_value = mock_repo
-
-        # Мокируем биллинг — бонус 0
-        mock_billing = MagicMock()
-        mock_billing.grant_registration_bonus = AsyncMock(return_value=0)
-        mock_billing_cls.return_value = mock_billing
-
-        await cmd_start(mock_message, mock_l10n_ru)
-
-    # Проверяем что язык был залогирован
-    assert any("language=ru" in record.message for record in caplog.records)
-
-
-@pytest.mark.asyncio
-async def test_cmd_start_sends_bonus_notification_if_granted(
-    mock_message: MagicMock,
-    mock_l10n_ru: MagicMock,
-) -> None:
-    """Тест: /start отправляет уведомление о бонусе если он был начислен."""
-
-    # Добавляем перевод для billing_registration_bonus
-    def get_translation(key: str, **kwargs: Any) -> str:
-        translations = {
-            "start_message": (
-                "Привет! Я бот для AI-генерации.\n\n"
-                "Доступные команды:\n"
-                "/start — начать работу\n"
-                "/language — выбрать язык интерфейса"
-            ),
-            "billing_registration_bonus": "Вам начислено {amount} токенов!",
-        }
-        text = translations.get(key, key)
-        if kwargs:
-            return text.format(**kwargs)
-        return text
-
-    mock_l10n_ru.get.side_effect = get_translation
-
-    # Мокируем legal config — отключаем проверку согласия
-    mock_legal_config = MagicMock()
-    mock_legal_config.enabled = False
-
-    with (
-        patch("src.bot.handlers.start.DatabaseSession") as mock_session_cls,
-        patch("src.bot.handlers.start.UserRepository") as mock_repo_cls,
-        patch("src.bot.handlers.start._detect_user_language", return_value="ru"),
-        patch("src.bot.handlers.start.create_billing_service") as mock_billing_cls,
-        patch("src.bot.handlers.start.WELCOME_IMAGE") as mock_welcome_image,
-        patch("src.bot.handlers.start.yaml_config") as mock_yaml_config,
-    ):
-        mock_yaml_config.legal = mock_legal_config
-
-        mock_session = AsyncMock()
-        mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-        mock_repo = MagicMock()
-        mock_repo.get_or_create = AsyncMock(
-            return_value=(MagicMock(spec=DbUser), True)  # created=True
-        )
-        mock_repo_cls.return_value = mock_repo
-
-        # Мокируем биллинг — начисляем бонус 100
-        mock_billing = MagicMock()
-        mock_billing.grant_registration_bonus = AsyncMock(return_value=100)
-        mock_billing_cls.return_value = mock_billing
-
-        # Мокируем welcome image — картинка существует
-        mock_welcome_image.exists.return_value = True
-
-        await cmd_start(mock_message, mock_l10n_ru)
-
-    # Проверяем что answer_photo вызван 1 раз (приветствие)
-    mock_message.answer_photo.assert_called_once()
-
-    # Проверяем что answer вызван 1 раз (уведомление о бонусе)
-    mock_message.answer.assert_called_once()
-
-    # Проверяем уведомление о бонусе
-    bonus_call = mock_message.answer.call_args[0]
-    assert "100 токенов" in bonus_call[0]
-
-
-@pytest.mark.asyncio
-async def test_cmd_start_no_bonus_notification_if_zero(
-    mock_message: MagicMock,
-    mock_l10n_ru: MagicMock,
-) -> None:
-    """Тест: /start не отправляет уведомление о бонусе если он 0."""
-    # Мокируем legal config — отключаем проверку согласия
-    mock_legal_config = MagicMock()
-    mock_legal_config.enabled = False
-
-    with (
-        patch("src.bot.handlers.start.DatabaseSession") as mock_session_cls,
-        patch("src.bot.handlers.start.UserRepository") as mock_repo_cls,
-        patch("src.bot.handlers.start._detect_user_language", return_value="ru"),
-        patch("src.bot.handlers.start.create_billing_service") as mock_billing_cls,
-        patch("src.bot.handlers.start.WELCOME_IMAGE") as mock_welcome_image,
-        patch("src.bot.handlers.start.yaml_config") as mock_yaml_config,
-    ):
-        mock_yaml_config.legal = mock_legal_config
-
-        mock_session = AsyncMock()
-        mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-        mock_repo = MagicMock()
-        mock_repo.get_or_create = AsyncMock(
-            return_value=(MagicMock(spec=DbUser), True)  # created=True
-        )
-        mock_repo_cls.return_value = mock_repo
-
-        # Мокируем биллинг — бонус 0
-        mock_billing = MagicMock()
-        mock_billing.grant_registration_bonus = AsyncMock(return_value=0)
-        mock_billing_cls.return_value = mock_billing
-
-        # Мокируем welcome image — картинка существует
-        mock_welcome_image.exists.return_value = True
-
-        await cmd_start(mock_message, mock_l10n_ru)
-
-    # Проверяем что был 1 вызов answer_photo (приветствие с картинкой)
-    mock_message.answer_photo.assert_called_once()
-
-    # Проверяем что answer не вызывался (бонус не начислен)
-    mock_message.answer.assert_not_called()
-
-
-@pytest.mark.asyncio
-async def test_cmd_start_sends_reply_keyboard_remove(
+@pytest.mark.parametrize(
+    ("image_exists", "bonus"),
+    [
+        pytest.param(True, 0, id="photo"),
+        pytest.param(False, 0, id="text_without_image"),
+        pytest.param(True, 100, id="photo_with_bonus"),
+        pytest.param(False, 100, id="text_with_bonus"),
+    ],
+)
+async def test_cmd_start_sends_welcome(
     mock_message: MagicMock,
     mock_l10n_ru: MagicMock,
+    start_patches: _StartPatches,
+    welcome_image: MagicMock,
+    image_exists: bool,
+    bonus: int,
 ) -> None:
-    """Тест: /start отправляет ReplyKeyboardRemove для очистки старой клавиатуры.
+    """Тест: /start отправляет приветствие и уведомление о начисленном бонусе.
 
-    ВАЖНО: ReplyKeyboardRemove гарантирует, что при перезапуске бота не будет
-    висеть устаревшая reply keyboard от предыдущей версии бота.
+    Приветствие уходит фото с подписью, если welcome image существует,
+    иначе — текстом. В обоих случаях с ReplyKeyboardRemove: при перезапуске
+    бота не должна висеть устаревшая reply keyboard от предыдущей версии.
+    Уведомление о бонусе отправляется отдельным сообщением, только если
+    бонус больше нуля.
     """
-    from aiogram.types import ReplyKeyboardRemove
-
-    # Мокируем legal config — отключаем проверку согласия
-    mock_legal_config = MagicMock()
-    mock_legal_config.enabled = False
-
-    with (
-        patch("src.bot.handlers.start.DatabaseSession") as mock_session_cls,
-        patch("src.bot.handlers.start.UserRepository") as mock_repo_cls,
-        patch("src.bot.handlers.start._detect_user_language", return_value="ru"),
-        patch("src.bot.handlers.start.create_billing_service") as mock_billing_cls,
-        patch("src.bot.handlers.start.WELCOME_IMAGE") as mock_welcome_image,
-        patch("src.bot.handlers.start.yaml_config") as mock_yaml_config,
-    ):
-        mock_yaml_config.legal = mock_legal_config
-
-        mock_session = AsyncMock()
-        mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-        mock_repo = MagicMock()
-        mock_repo.get_or_create = AsyncMock(
-            return_value=(MagicMock(spec=DbUser), True)  # created=True
-        )
-        mock_repo_cls.return_value = mock_repo
-
-        # Мокируем биллинг — бонус 0
-        mock_billing = MagicMock()
-        mock_billing.grant_registration_bonus = AsyncMock(return_value=0)
-        mock_billing_cls.return_value = mock_billing
-
-        # Мокируем welcome image — картинка существует
-        mock_welcome_image.exists.return_value = True
-
-        await cmd_start(mock_message, mock_l10n_ru)
+    start_patches.billing.grant_registration_bonus.return_value = bonus
+    welcome_image.exists.return_value = image_exists
 
-    # Проверяем что был вызов answer_photo с ReplyKeyboardRemove
-    mock_message.answer_photo.assert_called_once()
-    call_kwargs = mock_message.answer_photo.call_args[1]
-    assert "reply_markup" in call_kwargs
-    assert isinstance(call_kwargs["reply_markup"], ReplyKeyboardRemove)
-
-
-@pytest.mark.asyncio
-async def test_cmd_start_sends_reply_keyboard_remove_when_no_image(
-    mock_message: MagicMock,
-    mock_l10n_ru: MagicMock,
-) -> None:
-    """Тест: /start отправляет ReplyKeyboardRemove даже когда нет welcome image."""
-    from aiogram.types import ReplyKeyboardRemove
-
-    # Мокируем legal config — отключаем проверку согласия
-    mock_legal_config = MagicMock()
-    mock_legal_config.enabled = False
-
-    with (
-        patch("src.bot.handlers.start.DatabaseSession") as mock_session_cls,
-        patch("src.bot.handlers.start.UserRepository") as mock_repo_cls,
-        patch("src.bot.handlers.start._detect_user_language", return_value="ru"),
-        patch("src.bot.handlers.start.create_billing_service") as mock_billing_cls,
-        patch("src.bot.handlers.start.WELCOME_IMAGE") as mock_welcome_image,
-        patch("src.bot.handlers.start.yaml_config") as mock_yaml_config,
-    ):
-        mock_yaml_config.legal = mock_legal_config
-
-        mock_session = AsyncMock()
-        mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-        mock_repo = MagicMock()
-        mock_repo.get_or_create = AsyncMock(
-            return_value=(MagicMock(spec=DbUser), True)  # created=True
-        )
-        mock_repo_cls.return_value = mock_repo
+    await cmd_start(mock_message, mock_l10n_ru)
 
-        # Мокируем биллинг — бонус 0
-        mock_billing = MagicMock()
-        mock_billing.grant_registration_bonus = AsyncMock(return_value=0)
-        mock_billing_cls.return_value = mock_billing
+    answers = mock_message.answer.call_args_list
+    if image_exists:
+        mock_message.answer_photo.assert_called_once()
+        welcome = mock_message.answer_photo.call_args
+        assert welcome.kwargs["caption"] == _TRANSLATIONS_RU["start_message"]
+    else:
+        mock_message.answer_photo.assert_not_called()
+        welcome, *answers = answers
+        assert welcome.args[0] == _TRANSLATIONS_RU["start_message"]
+    assert isinstance(welcome.kwargs["reply_markup"], ReplyKeyboardRemove)
 
-        # Мокируем welcome image — картинка НЕ существует
-        mock_welcome_image.exists.return_value = False
-
-        await cmd_start(mock_message, mock_l10n_ru)
-
-    # Проверяем что был вызов answer с ReplyKeyboardRemove
-    mock_message.answer.assert_called_once()
-    call_kwargs = mock_message.answer.call_args[1]
-    assert "reply_markup" in call_kwargs
-    assert isinstance(call_kwargs["reply_markup"], ReplyKeyboardRemove)
+    # Остальные сообщения — только уведомление о бонусе
+    expected = [f"Вам начислено {bonus} токенов!"] if bonus else []
+    assert [answer.args[0] for answer in answers] == expected
 
 
 # ==============================================================================
@@ -741,19 +472,13 @@ async def test_cmd_start_sends_reply_keyboard_remove_when_no_image(
 # ==============================================================================
 
 
-@pytest.mark.asyncio
 async def test_cmd_start_processes_referral_link(
     mock_message: MagicMock,
     mock_l10n_ru: MagicMock,
-    caplog: pytest.LogCaptureFixture,
+    start_patches: _StartPatches,
+    info_caplog: pytest.LogCaptureFixture,
 ) -> None:
     """Тест: /start обрабатывает реферальную ссылку и вызывает process_referral."""
-    import logging
-
-    from src.services.referral_service import ReferralResult
-
-    caplog.set_level(logging.INFO)
-
     # Устанавливаем реферальный параметр
     mock_message.text = "/start ref_111111111"
 
@@ -765,72 +490,36 @@ async def test_cmd_start_processes_referral_link(
         bonus_pending=False,
     )
 
-    with (
-        patch("src.bot.handlers.start.DatabaseSession") as mock_session_cls,
-        patch("src.bot.handlers.start.UserRepository") as mock_repo_cls,
-        patch("src.bot.handlers.start._detect_user_language", return_value="ru"),
-        patch("src.bot.handlers.start.create_billing_service") as mock_billing_cls,
-        patch("src.bot.handlers.start.create_referral_service") as mock_referral_cls,
-    ):
-        mock_session = AsyncMock()
-        mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-        # Мок пользователя
-        mock_user = MagicMock(spec=DbUser)
-        mock_user.id = 1
-
-        mock_repo = MagicMock()
-        mock_repo.get_or_create = AsyncMock(
-            return_value=(mock_user, True)  # created=True
-        )
-        mock_repo_cls.return_value = mock_repo
-
-        # Мокируем биллинг — бонус 0
-        mock_billing = MagicMock()
-        mock_billing.grant_registration_bonus = AsyncMock(return_value=0)
-        mock_billing_cls.return_value = mock_billing
+    # Мок пользователя
+    mock_user = SimpleNamespace(id=1)
+    start_patches.repo.get_or_create.return_value = (mock_user, True)
 
-        # Мокируем реферальный сервис
-        mock_referral = MagicMock()
-        mock_referral.process_referral = AsyncMock(return_value=mock_referral_result)
-        mock_referral_cls.return_value = mock_referral
+    # Мокируем реферальный сервис
+    start_patches.referral.process_referral.return_value = mock_referral_result
 
-        await cmd_start(mock_message, mock_l10n_ru)
+    await cmd_start(mock_message, mock_l10n_ru)
 
     # Проверяем что process_referral был вызван с правильными параметрами
-    mock_referral.process_referral.assert_called_once_with(
+    start_patches.referral.process_referral.assert_called_once_with(
         invitee=mock_user,
         start_param="ref_111111111",
     )
 
     # Проверяем логирование
-    assert any("Реферал обработан" in record.message for record in caplog.records)
+    messages = " ".join(record.getMessage() for record in info_caplog.records)
+    assert "Реферал обработан" in messages
 
 
-@pytest.mark.asyncio
+@pytest.mark.usefixtures("welcome_image")
 async def test_cmd_start_shows_referral_bonus_notification(
     mock_message: MagicMock,
     mock_l10n_ru: MagicMock,
+    start_patches: _StartPatches,
 ) -> None:
     """Тест: /start показывает уведомление о реферальном бонусе."""
-    from src.services.referral_service import ReferralResult
-
     # Устанавливаем реферальный параметр
     mock_message.text = "/start ref_111111111"
 
-    # Добавляем перевод для referral_invitee_bonus
-    def get_translation(key: str, **kwargs: Any) -> str:
-        translations = {
-            "start_message": "Привет!",
-            "referral_invitee_bonus": "Бонус за приглашение: {amount} токенов!",
-        }
-        text = translations.get(key, key)
-        if kwargs:
-            return text.format(**kwargs)
-        return text
-
-    mock_l10n_ru.get.side_effect = get_translation
-
     # Создаём mock для результата реферала с бонусом
     mock_referral_result = ReferralResult(
         success=True,
@@ -839,45 +528,13 @@ async def test_cmd_start_shows_referral_bonus_notification(
         bonus_pending=False,
     )
 
-    # Мокируем legal config — отключаем проверку согласия
-    mock_legal_config = MagicMock()
-    mock_legal_config.enabled = False
-
-    with (
-        patch("src.bot.handlers.start.DatabaseSession") as mock_session_cls,
-        patch("src.bot.handlers.start.UserRepository") as mock_repo_cls,
-        patch("src.bot.handlers.start._detect_user_language", return_value="ru"),
-        patch("src.bot.handlers.start.create_billing_service") as mock_billing_cls,
-        patch("src.bot.handlers.start.create_referral_service") as mock_referral_cls,
-        patch("src.bot.handlers.start.WELCOME_IMAGE") as mock_welcome_image,
-        patch("src.bot.handlers.start.yaml_config") as mock_yaml_config,
-    ):
-        mock_yaml_config.legal = mock_legal_config
-
-        mock_session = AsyncMock()
-        mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-        mock_user = MagicMock(spec=DbUser)
-        mock_user.id = 1
-
-        mock_repo = MagicMock()
-        mock_repo.get_or_create = AsyncMock(return_value=(mock_user, True))
-        mock_repo_cls.return_value = mock_repo
-
-        # Мокируем биллинг — бонус 0
-        mock_billing = MagicMock()
-        mock_billing.grant_registration_bonus = AsyncMock(return_value=0)
-        mock_billing_cls.return_value = mock_billing
-
-        # Мокируем реферальный сервис
-        mock_referral = MagicMock()
-        mock_referral.process_referral = AsyncMock(return_value=mock_referral_result)
-        mock_referral_cls.return_value = mock_referral
+    mock_user = SimpleNamespace(id=1)
+    start_patches.repo.get_or_create.return_value = (mock_user, True)
 
-        # Мокируем welcome image — картинка существует
-        mock_welcome_image.exists.return_value = True
+    # Мокируем реферальный сервис
+    start_patches.referral.process_referral.return_value = mock_referral_result
 
-        await cmd_start(mock_message, mock_l10n_ru)
+    await cmd_start(mock_message, mock_l10n_ru)
 
     # Проверяем что answer вызван с уведомлением о бонусе
     # answer должен быть вызван 1 раз (реферальный бонус)
@@ -886,14 +543,13 @@ async def test_cmd_start_shows_referral_bonus_notification(
     assert "25 токенов" in bonus_call
 
 
-@pytest.mark.asyncio
+@pytest.mark.usefixtures("welcome_image")
 async def test_cmd_start_no_referral_notification_on_failure(
     mock_message: MagicMock,
     mock_l10n_ru: MagicMock,
+    start_patches: _StartPatches,
 ) -> None:
     """Тест: /start не показывает уведомление если реферал не обработан."""
-    from src.services.referral_service import ReferralResult
-
     # Устанавливаем неверный реферальный параметр
     mock_message.text = "/start ref_999999999"
 
@@ -904,87 +560,36 @@ async def test_cmd_start_no_referral_notification_on_failure(
         error="inviter_not_found",
     )
 
-    # Мокируем legal config — отключаем проверку согласия
-    mock_legal_config = MagicMock()
-    mock_legal_config.enabled = False
-
-    with (
-        patch("src.bot.handlers.start.DatabaseSession") as mock_session_cls,
-        patch("src.bot.handlers.start.UserRepository") as mock_repo_cls,
-        patch("src.bot.handlers.start._detect_user_language", return_value="ru"),
-        patch("src.bot.handlers.start.create_billing_service") as mock_billing_cls,
-        patch("src.bot.handlers.start.create_referral_service") as mock_referral_cls,
-        patch("src.bot.handlers.start.WELCOME_IMAGE") as mock_welcome_image,
-        patch("src.bot.handlers.start.yaml_config") as mock_yaml_config,
-    ):
-        mock_yaml_config.legal = mock_legal_config
-
-        mock_session = AsyncMock()
-        mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-        mock_user = MagicMock(spec=DbUser)
-        mock_user.id = 1
-
-        mock_repo = MagicMock()
-        mock_repo.get_or_create = AsyncMock(return_value=(mock_user, True))
-        mock_repo_cls.return_value = mock_repo
-
-        # Мокируем биллинг — бонус 0
-        mock_billing = MagicMock()
-        mock_billing.grant_registration_bonus = AsyncMock(return_value=0)
-        mock_billing_cls.return_value = mock_billing
+    mock_user = SimpleNamespace(id=1)
+    start_patches.repo.get_or_create.return_value = (mock_user, True)
 
-        # Мокируем реферальный сервис — возвращает failure
-        mock_referral = MagicMock()
-        mock_referral.process_referral = AsyncMock(return_value=mock_referral_result)
-        mock_referral_cls.return_value = mock_referral
+    # Мокируем реферальный сервис — возвращает failure
+    start_patches.referral.process_referral.return_value = mock_referral_result
 
-        # Мокируем welcome image — картинка существует
-        mock_welcome_image.exists.return_value = True
-
-        await cmd_start(mock_message, mock_l10n_ru)
+    await cmd_start(mock_message, mock_l10n_ru)
 
     # answer не должен быть вызван (бонус не начислен, реферал не удался)
     mock_message.answer.assert_not_called()
 
 
-@pytest.mark.asyncio
 async def test_cmd_start_does_not_process_referral_for_existing_user(
     mock_message: MagicMock,
     mock_l10n_ru: MagicMock,
+    start_patches: _StartPatches,
 ) -> None:
     """Тест: /start не обрабатывает реферал для существующего пользователя."""
-    from src.services.referral_service import ReferralResult
-
     # Устанавливаем реферальный параметр
     mock_message.text = "/start ref_111111111"
 
-    with (
-        patch("src.bot.handlers.start.DatabaseSession") as mock_session_cls,
-        patch("src.bot.handlers.start.UserRepository") as mock_repo_cls,
-        patch("src.bot.handlers.start._detect_user_language", return_value="ru"),
-        patch("src.bot.handlers.start.create_referral_service") as mock_referral_cls,
-    ):
-        mock_session = AsyncMock()
-        mock_session_cls.return_value.__aenter__.return_value = mock_session
-
-        mock_user = MagicMock(spec=DbUser)
-        mock_user.id = 1
-
-        mock_repo = MagicMock()
-        # Пользователь существует (created=False)
-        mock_repo.get_or_create = AsyncMock(return_value=(mock_user, False))
-        mock_repo.update_profile = AsyncMock()
-        mock_repo_cls.return_value = mock_repo
-
-        # Мокируем реферальный сервис
-        mock_referral = MagicMock()
-        mock_referral.process_referral = AsyncMock(
-            return_value=ReferralResult(success=True, invitee_bonus=25)
-        )
-        mock_referral_cls.return_value = mock_referral
+    mock_user = SimpleNamespace(id=1)
+    # Пользователь существует (created=False)
+    start_patches.repo.get_or_create.return_value = (mock_user, False)
+
+    start_patches.referral.process_referral.return_value = ReferralResult(
+        success=True, invitee_bonus=25
+    )
 
-        await cmd_start(mock_message, mock_l10n_ru)
+    await cmd_start(mock_message, mock_l10n_ru)
 
     # process_referral НЕ должен быть вызван для существующего пользователя
-    mock_referral.process_referral.assert_not_called()
+    start_patches.referral.process_referral.assert_not_called()
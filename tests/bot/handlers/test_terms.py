@@ -18,6 +18,9 @@
 10. Локализация работает для обоих языков (ru, en)
 """
 
+import logging
+from collections.abc import Iterator
+from types import SimpleNamespace
 from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -32,6 +35,9 @@ from src.bot.handlers.terms import (
 from src.db.models.user import User as DbUser
 from src.utils.i18n import Localization
 
+# Все тесты модуля выполняются в одном воркере xdist (--dist loadgroup).
+pytestmark = pytest.mark.xdist_group(name="terms_handlers")
+
 # ==============================================================================
 # ФИКСТУРЫ
 # ==============================================================================
@@ -40,65 +46,86 @@ from src.utils.i18n import Localization
 @pytest.fixture
 def mock_message() -> MagicMock:
     """Мок Message с пользователем."""
-    message = MagicMock(spec=Message)
-    message.from_user = User(
-        id=123456789,
-        is_bot=False,
-        first_name="Test User",
-        username="testuser",
+    return MagicMock(
+        spec=Message,
+        from_user=User(
+            id=123456789,
+            is_bot=False,
+            first_name="Test User",
+            username="testuser",
+        ),
+        answer=AsyncMock(),
+        answer_photo=AsyncMock(),
     )
-    message.answer = AsyncMock()
-    message.answer_photo = AsyncMock()
-    return message
 
 
 @pytest.fixture
 def mock_callback() -> MagicMock:
     """Мок CallbackQuery с пользователем и сообщением."""
-    callback = MagicMock(spec=CallbackQuery)
-    callback.from_user = User(
-        id=123456789,
-        is_bot=False,
-        first_name="Test User",
-        username="testuser",
+    return MagicMock(
+        spec=CallbackQuery,
+        from_user=User(
+            id=123456789,
+            is_bot=False,
+            first_name="Test User",
+            username="testuser",
+        ),
+        message=MagicMock(
+            spec=Message,
+            answer=AsyncMock(),
+            answer_photo=AsyncMock(),
+            edit_text=AsyncMock(),
+            edit_reply_markup=AsyncMock(),
+        ),
+        answer=AsyncMock(),
+        data="legal:accept",
     )
-    callback.message = MagicMock(spec=Message)
-    callback.message.answer = AsyncMock()
-    callback.message.answer_photo = AsyncMock()
-    callback.message.edit_text = AsyncMock()
-    callback.message.edit_reply_markup = AsyncMock()
-    callback.answer = AsyncMock()
-    callback.data = "legal:accept"
-    return callback
 
 
-@pytest.fixture
-def mock_l10n_ru() -> MagicMock:
-    """Мок Localization для русского языка."""
+_TRANSLATIONS_RU = {
+    "legal_documents_message": (
+        "📜 <b>Юридические документы</b>\n\nПожалуйста, ознакомьтесь:"
+    ),
+    "legal_disabled": "ℹ️ Юридические документы в данный момент недоступны.",
+    "legal_not_configured": "⚠️ Юридические документы ещё не настроены.",
+    "legal_acceptance_request": (
+        "📜 <b>Добро пожаловать!</b>\n\n"
+        "Прежде чем начать, ознакомьтесь с нашими документами:"
+    ),
+    "legal_accepted_notification": "✅ Спасибо! Условия приняты.",
+    "legal_accepted_message": (
+        "✅ <b>Условия приняты</b>\n\nТеперь вы можете использовать бота."
+    ),
+    "legal_already_accepted": "Вы уже приняли эти условия",
+    "start_message": "Привет! Я бот для AI-генерации.",
+    "billing_registration_bonus": "🎁 Вам начислено {amount} токенов!",
+    "error_callback_data": "❌ Ошибка обработки запроса",
+    "error_user_not_found": "❌ Пользователь не найден",
+}
+
+_TRANSLATIONS_EN = {
+    "legal_documents_message": "📜 <b>Legal Documents</b>\n\nPlease review:",
+    "legal_disabled": "ℹ️ Legal documents are currently unavailable.",
+    "legal_not_configured": "⚠️ Legal documents are not yet configured.",
+    "legal_acceptance_request": (
+        "📜 <b>Welcome!</b>\n\nBefore you start, please review our documents:"
+    ),
+    "legal_accepted_notification": "✅ Thank you! Terms accepted.",
+    "legal_accepted_message": "✅ <b>Terms Accepted</b>\n\nYou can now use the bot.",
+    "legal_already_accepted": "You have already accepted these terms",
+    "start_message": "Hello! I'm an AI generation bot.",
+    "billing_registration_bonus": "🎁 You've been credited {amount} tokens!",
+    "error_callback_data": "❌ Error processing request",
+    "error_user_not_found": "❌ User not found",
+}
+
+
+def _make_l10n(language: str, translations: dict[str, str]) -> MagicMock:
+    """Создать мок Localization, возвращающий переводы из словаря."""
     l10n = MagicMock(spec=Localization)
-    l10n.language = "ru"
+    l10n.language = language
 
     def get_translation(key: str, **kwargs: Any) -> str:
-        translations = {
-            "legal_documents_message": (
-                "📜 <b>Юридические документы</b>\n\nПожалуйста, ознакомьтесь:"
-            ),
-            "legal_disabled": ("ℹ️ Юридические документы в данный момент недоступны."),
-            "legal_not_configured": ("⚠️ Юридические документы ещё не настроены."),
-            "legal_acceptance_request": (
-                "📜 <b>Добро пожаловать!</b>\n\n"
-                "Прежде чем начать, ознакомьтесь с нашими документами:"
-            ),
-            "legal_accepted_notification": "✅ Спасибо! Условия приняты.",
-            "legal_accepted_message": (
-                "✅ <b>Условия приняты</b>\n\nТеперь вы можете использовать бота."
-            ),
-            "legal_already_accepted": "Вы уже приняли эти условия",
-            "start_message": "Привет! Я бот для AI-генерации.",
-            "billing_registration_bonus": "🎁 Вам начислено {amount} токенов!",
-            "error_callback_data": "❌ Ошибка обработки запроса",
-            "error_user_not_found": "❌ Пользователь не найден",
-        }
         text = translations.get(key, key)
         if kwargs:
             return text.format(**kwargs)
@@ -108,37 +135,55 @@ def mock_l10n_ru() -> MagicMock:
     return l10n
 
 
+@pytest.fixture(scope="module")
+def module_l10n_ru() -> MagicMock:
+    """Мок Localization для русского языка, один на модуль.
+
+    Напрямую в тестах не используется — см. фикстуру mock_l10n_ru.
+    """
+    return _make_l10n("ru", _TRANSLATIONS_RU)
+
+
+@pytest.fixture(scope="module")
+def module_l10n_en() -> MagicMock:
+    """Мок Localization для английского языка, один на модуль.
+
+    Напрямую в тестах не используется — см. фикстуру mock_l10n_en.
+    """
+    return _make_l10n("en", _TRANSLATIONS_EN)
+
+
 @pytest.fixture
-def mock_l10n_en() -> MagicMock:
-    """Мок Localization для английского языка."""
-    l10n = MagicMock(spec=Localization)
-    l10n.language = "en"
+def mock_l10n_ru(module_l10n_ru: MagicMock) -> Iterator[MagicMock]:
+    """Мок Localization для русского языка (см. module_l10n_ru).
 
-    def get_translation(key: str, **kwargs: Any) -> str:
-        translations = {
-            "legal_documents_message": ("📜 <b>Legal Documents</b>\n\nPlease review:"),
-            "legal_disabled": "ℹ️ Legal documents are currently unavailable.",
-            "legal_not_configured": ("⚠️ Legal documents are not yet configured."),
-            "legal_acceptance_request": (
-                "📜 <b>Welcome!</b>\n\nBefore you start, please review our documents:"
-            ),
-            "legal_accepted_notification": "✅ Thank you! Terms accepted.",
-            "legal_accepted_message": (
-                "✅ <b>Terms Accepted</b>\n\nYou can now use the bot."
-            ),
-            "legal_already_accepted": "You have already accepted these terms",
-            "start_message": "Hello! I'm an AI generation bot.",
-            "billing_registration_bonus": ("🎁 You've been credited {amount} tokens!"),
-            "error_callback_data": "❌ Error processing request",
-            "error_user_not_found": "❌ User not found",
-        }
-        text = translations.get(key, key)
-        if kwargs:
-            return text.format(**kwargs)
-        return text
+    После теста очищается история вызовов; side_effect тесты не меняют.
+    """
+    yield module_l10n_ru
+    module_l10n_ru.reset_mock()
 
-    l10n.get.side_effect = get_translation
-    return l10n
+
+@pytest.fixture
+def mock_l10n_en(module_l10n_en: MagicMock) -> Iterator[MagicMock]:
+    """Мок Localization для английского языка (см. module_l10n_en)."""
+    yield module_l10n_en
+    module_l10n_en.reset_mock()
+
+
+# Заглушки секции legal из config.yaml. Обработчики только читают
+# их поля, поэтому они общие для всех тестов модуля.
+_PRIVACY_URL = "https://example.com/privacy"
+_TERMS_URL = "https://example.com/terms"
+
+_LEGAL_CONFIGURED = SimpleNamespace(
+    enabled=True,
+    version="1.0",
+    privacy_policy_url=_PRIVACY_URL,
+    terms_of_service_url=_TERMS_URL,
+    has_documents=lambda: True,
+)
+_LEGAL_DISABLED = SimpleNamespace(enabled=False)
+_LEGAL_NOT_CONFIGURED = SimpleNamespace(enabled=True, has_documents=lambda: False)
 
 
 # ==============================================================================
@@ -146,7 +191,6 @@ def mock_l10n_en() -> MagicMock:
 # ==============================================================================
 
 
-@pytest.mark.asyncio
 async def test_cmd_terms_shows_documents_when_enabled(
     mock_message: MagicMock,
     mock_l10n_ru: MagicMock,
@@ -159,12 +203,7 @@ async def test_cmd_terms_shows_documents_when_enabled(
         ) as mock_keyboard,
     ):
         # Настраиваем мок конфигурации
-        mock_legal = MagicMock()
-        mock_legal.enabled = True
-        mock_legal.has_documents.return_value = True
-        mock_legal.privacy_policy_url = "https://example.com/privacy"
-        mock_legal.terms_of_service_url = "https://example.com/terms"
-        mock_config.legal = mock_legal
+        mock_config.legal = _LEGAL_CONFIGURED
 
         # Мок клавиатуры
         mock_keyboard.return_value = MagicMock()
@@ -179,21 +218,18 @@ async def test_cmd_terms_shows_documents_when_enabled(
     # Проверяем что клавиатура создана с правильными параметрами
     mock_keyboard.assert_called_once_with(
         l10n=mock_l10n_ru,
-        privacy_policy_url="https://example.com/privacy",
-        terms_of_service_url="https://example.com/terms",
+        privacy_policy_url=_PRIVACY_URL,
+        terms_of_service_url=_TERMS_URL,
     )
 
 
-@pytest.mark.asyncio
 async def test_cmd_terms_shows_disabled_message_when_disabled(
     mock_message: MagicMock,
     mock_l10n_ru: MagicMock,
 ) -> None:
     """Тест: /terms показывает сообщение если документы отключены."""
     with patch("src.bot.handlers.terms.yaml_config") as mock_config:
-        mock_legal = MagicMock()
-        mock_legal.enabled = False
-        mock_config.legal = mock_legal
+        mock_config.legal = _LEGAL_DISABLED
 
         await cmd_terms(mock_message, mock_l10n_ru)
 
@@ -203,17 +239,13 @@ async def test_cmd_terms_shows_disabled_message_when_disabled(
     assert "недоступны" in call_args[0]
 
 
-@pytest.mark.asyncio
 async def test_cmd_terms_shows_not_configured_message(
     mock_message: MagicMock,
     mock_l10n_ru: MagicMock,
 ) -> None:
     """Тест: /terms показывает сообщение если документы не настроены."""
     with patch("src.bot.handlers.terms.yaml_config") as mock_config:
-        mock_legal = MagicMock()
-        mock_legal.enabled = True
-        mock_legal.has_documents.return_value = False
-        mock_config.legal = mock_legal
+        mock_config.legal = _LEGAL_NOT_CONFIGURED
 
         await cmd_terms(mock_message, mock_l10n_ru)
 
@@ -223,7 +255,6 @@ async def test_cmd_terms_shows_not_configured_message(
     assert "не настроены" in call_args[0]
 
 
-@pytest.mark.asyncio
 async def test_cmd_terms_localization_en(
     mock_message: MagicMock,
     mock_l10n_en: MagicMock,
@@ -235,12 +266,7 @@ async def test_cmd_terms_localization_en(
             "src.bot.handlers.terms.create_legal_documents_keyboard"
         ) as mock_keyboard,
     ):
-        mock_legal = MagicMock()
-        mock_legal.enabled = True
-        mock_legal.has_documents.return_value = True
-        mock_legal.privacy_policy_url = "https://example.com/privacy"
-        mock_legal.terms_of_service_url = "https://example.com/terms"
-        mock_config.legal = mock_legal
+        mock_config.legal = _LEGAL_CONFIGURED
 
         mock_keyboard.return_value = MagicMock()
 
@@ -257,10 +283,13 @@ async def test_cmd_terms_localization_en(
 # ==============================================================================
 
 
-@pytest.mark.asyncio
 async def test_callback_accept_terms_saves_acceptance(
     mock_callback: MagicMock,
     mock_l10n_ru: MagicMock,
+    mock_user_repo: MagicMock,
+    mock_billing: Any,
+    db_session_cm: Any,
+    async_session: Any,
 ) -> None:
     """Тест: callback сохраняет согласие в БД."""
     with (
@@ -270,32 +299,25 @@ async def test_callback_accept_terms_saves_acceptance(
         patch("src.bot.handlers.terms.create_billing_service") as mock_billing_cls,
     ):
         # Настраиваем конфигурацию
-        mock_legal = MagicMock()
-        mock_legal.version = "1.0"
-        mock_config.legal = mock_legal
+        mock_config.legal = _LEGAL_CONFIGURED
 
-        # Настраиваем DatabaseSession
-        mock_session = AsyncMock()
-        mock_session_cls.return_value.__aenter__.return_value = mock_session
+        # Сессия нужна обработчику для refresh после accept_terms
+        db_session_cm.value = async_session
+        mock_session_cls.return_value = db_session_cm
 
         # Настраиваем UserRepository
-        mock_user = MagicMock(spec=DbUser)
-        mock_user.balance = 0
-        mock_repo = MagicMock()
-        mock_repo.get_by_telegram_id = AsyncMock(return_value=mock_user)
-        mock_repo.needs_terms_acceptance.return_value = True
-        mock_repo.accept_terms = AsyncMock()
-        mock_repo_cls.return_value = mock_repo
+        mock_user = MagicMock(spec=DbUser, balance=0)
+        mock_user_repo.get_by_telegram_id.return_value = mock_user
+        mock_user_repo.needs_terms_acceptance.return_value = True
+        mock_repo_cls.return_value = mock_user_repo
 
         # Мокируем биллинг
-        mock_billing = MagicMock()
-        mock_billing.grant_registration_bonus = AsyncMock(return_value=0)
         mock_billing_cls.return_value = mock_billing
 
         await callback_accept_terms(mock_callback, mock_l10n_ru)
 
     # Проверяем что accept_terms был вызван
-    mock_repo.accept_terms.assert_called_once_with(mock_user, "1.0")
+    mock_user_repo.accept_terms.assert_called_once_with(mock_user, "1.0")
 
     # Проверяем что отправлено уведомление
     mock_callback.answer.assert_called_once()
@@ -304,10 +326,14 @@ async def test_callback_accept_terms_saves_acceptance(
     mock_callback.message.edit_text.assert_called_once()
 
 
-@pytest.mark.asyncio
+@pytest.mark.usefixtures("welcome_image")
 async def test_callback_accept_terms_grants_registration_bonus(
     mock_callback: MagicMock,
     mock_l10n_ru: MagicMock,
+    mock_user_repo: MagicMock,
+    mock_billing: Any,
+    db_session_cm: Any,
+    async_session: Any,
 ) -> None:
     """Тест: callback начисляет регистрационный бонус при первом согласии."""
     with (
@@ -315,36 +341,29 @@ async def test_callback_accept_terms_grants_registration_bonus(
         patch("src.bot.handlers.terms.DatabaseSession") as mock_session_cls,
         patch("src.bot.handlers.terms.UserRepository") as mock_repo_cls,
         patch("src.bot.handlers.terms.create_billing_service") as mock_billing_cls,
-        patch("src.bot.handlers.terms.WELCOME_IMAGE") as mock_welcome_image,
     ):
-        mock_legal = MagicMock()
-        mock_legal.version = "1.0"
-        mock_config.legal = mock_legal
+        mock_config.legal = _LEGAL_CONFIGURED
         # Мокаем биллинг конфиг чтобы grant_registration_bonus вызывался
-        mock_config.billing = MagicMock()
-        mock_config.billing.registration_bonus = 100
+        mock_config.billing = MagicMock(registration_bonus=100)
 
-        mock_session = AsyncMock()
-        mock_session_cls.return_value.__aenter__.return_value = mock_session
+        # Сессия нужна обработчику для refresh после accept_terms
+        db_session_cm.value = async_session
+        mock_session_cls.return_value = db_session_cm
 
         # Пользователь с балансом 0 (бонус ещё не начислялся)
-        mock_user = MagicMock(spec=DbUser)
-        mock_user.balance = 0
-        mock_user.registration_bonus_granted = False  # Бонус ещё не начислен
-        mock_repo = MagicMock()
-        mock_repo.get_by_telegram_id = AsyncMock(return_value=mock_user)
-        mock_repo.needs_terms_acceptance.return_value = True
-        mock_repo.accept_terms = AsyncMock()
-        mock_repo_cls.return_value = mock_repo
+        mock_user = MagicMock(
+            spec=DbUser,
+            balance=0,
+            registration_bonus_granted=False,  # Бонус ещё не начислен
+        )
+        mock_user_repo.get_by_telegram_id.return_value = mock_user
+        mock_user_repo.needs_terms_acceptance.return_value = True
+        mock_repo_cls.return_value = mock_user_repo
 
         # Биллинг начисляет бонус 100
-        mock_billing = MagicMock()
-        mock_billing.grant_registration_bonus = AsyncMock(return_value=100)
+        mock_billing.grant_registration_bonus.return_value = 100
         mock_billing_cls.return_value = mock_billing
 
-        # Мокируем welcome image — картинка существует
-        mock_welcome_image.exists.return_value = True
-
         await callback_accept_terms(mock_callback, mock_l10n_ru)
 
     # Проверяем что бонус был начислен
@@ -359,10 +378,11 @@ async def test_callback_accept_terms_grants_registration_bonus(
     assert "100 токенов" in bonus_call[0]
 
 
-@pytest.mark.asyncio
 async def test_callback_accept_terms_handles_already_accepted(
     mock_callback: MagicMock,
     mock_l10n_ru: MagicMock,
+    mock_user_repo: MagicMock,
+    db_session_cm: Any,
 ) -> None:
     """Тест: callback обрабатывает повторное нажатие (already accepted)."""
     with (
@@ -370,19 +390,15 @@ async def test_callback_accept_terms_handles_already_accepted(
         patch("src.bot.handlers.terms.DatabaseSession") as mock_session_cls,
         patch("src.bot.handlers.terms.UserRepository") as mock_repo_cls,
     ):
-        mock_legal = MagicMock()
-        mock_legal.version = "1.0"
-        mock_config.legal = mock_legal
+        mock_config.legal = _LEGAL_CONFIGURED
 
-        mock_session = AsyncMock()
-        mock_session_cls.return_value.__aenter__.return_value = mock_session
+        mock_session_cls.return_value = db_session_cm
 
         mock_user = MagicMock(spec=DbUser)
-        mock_repo = MagicMock()
-        mock_repo.get_by_telegram_id = AsyncMock(return_value=mock_user)
+        mock_user_repo.get_by_telegram_id.return_value = mock_user
         # Пользователь уже принял условия
-        mock_repo.needs_terms_acceptance.return_value = False
-        mock_repo_cls.return_value = mock_repo
+        mock_user_repo.needs_terms_acceptance.return_value = False
+        mock_repo_cls.return_value = mock_user_repo
 
         await callback_accept_terms(mock_callback, mock_l10n_ru)
 
@@ -395,10 +411,11 @@ async def test_callback_accept_terms_handles_already_accepted(
     mock_callback.message.edit_reply_markup.assert_called_once_with(reply_markup=None)
 
 
-@pytest.mark.asyncio
 async def test_callback_accept_terms_handles_user_not_found(
     mock_callback: MagicMock,
     mock_l10n_ru: MagicMock,
+    mock_user_repo: MagicMock,
+    db_session_cm: Any,
 ) -> None:
     """Тест: callback обрабатывает отсутствие пользователя в БД."""
     with (
@@ -406,17 +423,13 @@ async def test_callback_accept_terms_handles_user_not_found(
         patch("src.bot.handlers.terms.DatabaseSession") as mock_session_cls,
         patch("src.bot.handlers.terms.UserRepository") as mock_repo_cls,
     ):
-        mock_legal = MagicMock()
-        mock_legal.version = "1.0"
-        mock_config.legal = mock_legal
+        mock_config.legal = _LEGAL_CONFIGURED
 
-        mock_session = AsyncMock()
-        mock_session_cls.return_value.__aenter__.return_value = mock_session
+        mock_session_cls.return_value = db_session_cm
 
         # Пользователь не найден
-        mock_repo = MagicMock()
-        mock_repo.get_by_telegram_id = AsyncMock(return_value=None)
-        mock_repo_cls.return_value = mock_repo
+        mock_user_repo.get_by_telegram_id.return_value = None
+        mock_repo_cls.return_value = mock_user_repo
 
         await callback_accept_terms(mock_callback, mock_l10n_ru)
 
@@ -427,15 +440,16 @@ async def test_callback_accept_terms_handles_user_not_found(
     assert call_args[1]["show_alert"] is True
 
 
-@pytest.mark.asyncio
 async def test_callback_accept_terms_handles_missing_message(
     mock_l10n_ru: MagicMock,
 ) -> None:
     """Тест: callback обрабатывает отсутствие message."""
-    callback = MagicMock(spec=CallbackQuery)
-    callback.message = None
-    callback.from_user = User(id=123456789, is_bot=False, first_name="Test")
-    callback.answer = AsyncMock()
+    callback = MagicMock(
+        spec=CallbackQuery,
+        message=None,
+        from_user=User(id=123456789, is_bot=False, first_name="Test"),
+        answer=AsyncMock(),
+    )
 
     await callback_accept_terms(callback, mock_l10n_ru)
 
@@ -443,15 +457,16 @@ async def test_callback_accept_terms_handles_missing_message(
     callback.answer.assert_called_once()
 
 
-@pytest.mark.asyncio
 async def test_callback_accept_terms_handles_missing_user(
     mock_l10n_ru: MagicMock,
 ) -> None:
     """Тест: callback обрабатывает отсутствие from_user."""
-    callback = MagicMock(spec=CallbackQuery)
-    callback.message = MagicMock(spec=Message)
-    callback.from_user = None
-    callback.answer = AsyncMock()
+    callback = MagicMock(
+        spec=CallbackQuery,
+        message=MagicMock(spec=Message),
+        from_user=None,
+        answer=AsyncMock(),
+    )
 
     await callback_accept_terms(callback, mock_l10n_ru)
 
@@ -459,10 +474,13 @@ async def test_callback_accept_terms_handles_missing_user(
     callback.answer.assert_called_once()
 
 
-@pytest.mark.asyncio
 async def test_callback_accept_terms_localization_en(
     mock_callback: MagicMock,
     mock_l10n_en: MagicMock,
+    mock_user_repo: MagicMock,
+    mock_billing: Any,
+    db_session_cm: Any,
+    async_session: Any,
 ) -> None:
     """Тест: callback использует английскую локализацию."""
     with (
@@ -471,23 +489,17 @@ async def test_callback_accept_terms_localization_en(
         patch("src.bot.handlers.terms.UserRepository") as mock_repo_cls,
         patch("src.bot.handlers.terms.create_billing_service") as mock_billing_cls,
     ):
-        mock_legal = MagicMock()
-        mock_legal.version = "1.0"
-        mock_config.legal = mock_legal
+        mock_config.legal = _LEGAL_CONFIGURED
 
-        mock_session = AsyncMock()
-        mock_session_cls.return_value.__aenter__.return_value = mock_session
+        # Сессия нужна обработчику для refresh после accept_terms
+        db_session_cm.value = async_session
+        mock_session_cls.return_value = db_session_cm
+
+        mock_user = MagicMock(spec=DbUser, balance=0)
+        mock_user_repo.get_by_telegram_id.return_value = mock_user
+        mock_user_repo.needs_terms_acceptance.return_value = True
+        mock_repo_cls.return_value = mock_user_repo
 
-        mock_user = MagicMock(spec=DbUser)
-        mock_user.balance = 0
-        mock_repo = MagicMock()
-        mock_repo.get_by_telegram_id = AsyncMock(return_value=mock_user)
-        mock_repo.needs_terms_acceptance.return_value = True
-        mock_repo.accept_terms = AsyncMock()
-        mock_repo_cls.return_value = mock_repo
-
-        mock_billing = MagicMock()
-        mock_billing.grant_registration_bonus = AsyncMock(return_value=0)
         mock_billing_cls.return_value = mock_billing
 
         await callback_accept_terms(mock_callback, mock_l10n_en)
@@ -497,10 +509,14 @@ async def test_callback_accept_terms_localization_en(
     assert "Terms Accepted" in call_args[0]
 
 
-@pytest.mark.asyncio
+@pytest.mark.usefixtures("welcome_image")
 async def test_callback_accept_terms_no_bonus_if_balance_not_zero(
     mock_callback: MagicMock,
     mock_l10n_ru: MagicMock,
+    mock_user_repo: MagicMock,
+    mock_billing: Any,
+    db_session_cm: Any,
+    async_session: Any,
 ) -> None:
     """Тест: callback не начисляет бонус если баланс не равен 0."""
     with (
@@ -508,30 +524,20 @@ async def test_callback_accept_terms_no_bonus_if_balance_not_zero(
         patch("src.bot.handlers.terms.DatabaseSession") as mock_session_cls,
         patch("src.bot.handlers.terms.UserRepository") as mock_repo_cls,
         patch("src.bot.handlers.terms.create_billing_service") as mock_billing_cls,
-        patch("src.bot.handlers.terms.WELCOME_IMAGE") as mock_welcome_image,
     ):
-        mock_legal = MagicMock()
-        mock_legal.version = "1.0"
-        mock_config.legal = mock_legal
+        mock_config.legal = _LEGAL_CONFIGURED
 
-        mock_session = AsyncMock()
-        mock_session_cls.return_value.__aenter__.return_value = mock_session
+        # Сессия нужна обработчику для refresh после accept_terms
+        db_session_cm.value = async_session
+        mock_session_cls.return_value = db_session_cm
 
         # Пользователь с балансом > 0 (бонус уже начислялся)
-        mock_user = MagicMock(spec=DbUser)
-        mock_user.balance = 100
-        mock_repo = MagicMock()
-        mock_repo.get_by_telegram_id = AsyncMock(return_value=mock_user)
-        mock_repo.needs_terms_acceptance.return_value = True
-        mock_repo.accept_terms = AsyncMock()
-        mock_repo_cls.return_value = mock_repo
-
-        mock_billing = MagicMock()
-        mock_billing.grant_registration_bonus = AsyncMock(return_value=0)
-        mock_billing_cls.return_value = mock_billing
+        mock_user = MagicMock(spec=DbUser, balance=100)
+        mock_user_repo.get_by_telegram_id.return_value = mock_user
+        mock_user_repo.needs_terms_acceptance.return_value = True
+        mock_repo_cls.return_value = mock_user_repo
 
-        # Мокируем welcome image — картинка существует
-        mock_welcome_image.exists.return_value = True
+        mock_billing_cls.return_value = mock_billing
 
         await callback_accept_terms(mock_callback, mock_l10n_ru)
 
@@ -550,7 +556,6 @@ async def test_callback_accept_terms_no_bonus_if_balance_not_zero(
 # ==============================================================================
 
 
-@pytest.mark.asyncio
 async def test_show_terms_acceptance_request_shows_request(
     mock_message: MagicMock,
     mock_l10n_ru: MagicMock,
@@ -562,11 +567,7 @@ async def test_show_terms_acceptance_request_shows_request(
             "src.bot.handlers.terms.create_terms_acceptance_keyboard"
         ) as mock_keyboard,
     ):
-        mock_legal = MagicMock()
-        mock_legal.has_documents.return_value = True
-        mock_legal.privacy_policy_url = "https://example.com/privacy"
-        mock_legal.terms_of_service_url = "https://example.com/terms"
-        mock_config.legal = mock_legal
+        mock_config.legal = _LEGAL_CONFIGURED
 
         mock_keyboard.return_value = MagicMock()
 
@@ -583,12 +584,11 @@ async def test_show_terms_acceptance_request_shows_request(
     # Проверяем что клавиатура создана с правильными параметрами
     mock_keyboard.assert_called_once_with(
         l10n=mock_l10n_ru,
-        privacy_policy_url="https://example.com/privacy",
-        terms_of_service_url="https://example.com/terms",
+        privacy_policy_url=_PRIVACY_URL,
+        terms_of_service_url=_TERMS_URL,
     )
 
 
-@pytest.mark.asyncio
 async def test_show_terms_acceptance_request_returns_false_if_not_configured(
     mock_message: MagicMock,
     mock_l10n_ru: MagicMock,
@@ -598,14 +598,10 @@ async def test_show_terms_acceptance_request_returns_false_if_not_configured(
 
     Когда документы не настроены.
     """
-    import logging
-
-    caplog.set_level(logging.WARNING)
+    caplog.set_level(logging.WARNING, logger="src.bot.handlers.terms")
 
     with patch("src.bot.handlers.terms.yaml_config") as mock_config:
-        mock_legal = MagicMock()
-        mock_legal.has_documents.return_value = False
-        mock_config.legal = mock_legal
+        mock_config.legal = _LEGAL_NOT_CONFIGURED
 
         result = await show_terms_acceptance_request(mock_message, mock_l10n_ru)
 
@@ -616,10 +612,10 @@ async def test_show_terms_acceptance_request_returns_false_if_not_configured(
     mock_message.answer.assert_not_called()
 
     # Проверяем что залогировано предупреждение
-    assert any("не настроены" in record.message for record in caplog.records)
+    messages = " ".join(record.getMessage() for record in caplog.records)
+    assert "не настроены" in messages
 
 
-@pytest.mark.asyncio
 async def test_show_terms_acceptance_request_localization_en(
     mock_message: MagicMock,
     mock_l10n_en: MagicMock,
@@ -631,11 +627,7 @@ async def test_show_terms_acceptance_request_localization_en(
             "src.bot.handlers.terms.create_terms_acceptance_keyboard"
         ) as mock_keyboard,
     ):
-        mock_legal = MagicMock()
-        mock_legal.has_documents.return_value = True
-        mock_legal.privacy_policy_url = "https://example.com/privacy"
-        mock_legal.terms_of_service_url = "https://example.com/terms"
-        mock_config.legal = mock_legal
+        mock_config.legal = _LEGAL_CONFIGURED
 
         mock_keyboard.return_value = MagicMock()
 
@@ -8,7 +8,7 @@
 """
 
 import asyncio
-from collections.abc import AsyncGenerator, Callable, Generator
+from collections.abc import AsyncGenerator, Callable, Mapping
 from contextlib import AbstractAsyncContextManager
 from typing import Any
 
@@ -20,20 +20,27 @@ from src.db.models.message import Message
 from src.db.models.user import User
 from src.db.models_base import Base
 
+try:
+    import uvloop
+except ImportError:  # uvloop не поддерживает Windows
+    uvloop = None
 
-@pytest.fixture(scope="session")
-def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
-    """Создать event loop для всей тестовой сессии.
 
-    По умолчанию pytest-asyncio создаёт новый event loop для каждого теста,
-    но мы используем session-scoped loop для совместимости с БД-фикстурами.
+@pytest.hookimpl(optionalhook=True)
+def pytest_asyncio_loop_factories(
+    config: pytest.Config,
+    item: pytest.Item,
+) -> Mapping[str, Callable[[], asyncio.AbstractEventLoop]]:
+    """Запускать async-тесты на event loop uvloop, если он установлен.
 
-    Yields:
-        Event loop для выполнения асинхронных тестов.
+    uvloop быстрее стандартного loop в планировании задач, а каждый тест
+    обработчика — это несколько await на AsyncMock. Без uvloop (Windows)
+    используется стандартный asyncio. Версии pytest-asyncio без этого хука
+    его просто игнорируют (optionalhook).
     """
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+    if uvloop is not None:
+        return {"uvloop": uvloop.new_event_loop}
+    return {"asyncio": asyncio.new_event_loop}
 
 
 @pytest_asyncio.fixture(scope="function")
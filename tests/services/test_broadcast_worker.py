@@ -125,6 +125,10 @@ async def test_worker_start_creates_background_task(
     assert worker._running is True
     assert worker._task is not None
 
+    # Останавливаем воркер: event loop общий на сессию, иначе задача
+    # продолжит работать после закрытия тестовой БД.
+    await worker.stop()
+
 
 @pytest.mark.asyncio
 async def test_worker_stop_cancels_task(
@@ -157,6 +161,8 @@ async def test_worker_start_twice_does_nothing(
 
     assert worker._task is first_task
 
+    await worker.stop()
+
 
 # ==============================================================================
 # ТЕСТЫ ОТПРАВКИ СООБЩЕНИЯ